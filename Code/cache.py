@@ -0,0 +1,186 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    A keyed cache of calculated values, bounded in size.
+
+    Call `get(key, calculate)` to obtain the value for `key`, calling
+    `calculate()` only if the value is not cached. Values are kept in
+    memory until their total size exceeds `max_bytes`, and then the
+    least recently used values are evicted. If `directory` is given,
+    then values are also pickled to files in that directory, and are
+    loaded from the files when they are not in memory. Keys must have
+    deterministic representations as strings, e.g., tuples of strings,
+    integers, and `Fraction` objects.
+
+    The numbers of values calculated, loaded from disk, and found in
+    memory are counted in members `n_calculated`, `n_loaded`, and
+    `n_hits`. Member `n_bytes` is the total size of values in memory.
+    """
+    def __init__(self, max_bytes=2**28, directory=None):
+        """
+        Creates an empty cache.
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.values = OrderedDict()
+        self.sizes = dict()
+        self.n_bytes = 0
+        self.n_calculated = 0
+        self.n_loaded = 0
+        self.n_hits = 0
+
+    def get(self, key, calculate):
+        """
+        Returns the value for `key`, calculating it if necessary.
+        """
+        if key in self.values:
+            self.n_hits += 1
+            self.values.move_to_end(key)
+            return self.values[key]
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            self.n_loaded += 1
+        else:
+            value = calculate()
+            self.n_calculated += 1
+            if path is not None:
+                temporary = path + '.tmp{}'.format(os.getpid())
+                with open(temporary, 'wb') as file:
+                    pickle.dump(value, file)
+                os.replace(temporary, path)
+        self._insert(key, value)
+        return value
+
+    def clear(self):
+        """
+        Evicts all values from memory. Files on disk are kept.
+        """
+        self.values.clear()
+        self.sizes.clear()
+        self.n_bytes = 0
+
+    def _insert(self, key, value):
+        # Inserts the value as the most recently used, and then evicts
+        # least recently used values until the size limit is met. A
+        # value larger than the limit is not kept.
+        size = n_bytes(value)
+        self.values[key] = value
+        self.sizes[key] = size
+        self.n_bytes += size
+        while self.n_bytes > self.max_bytes:
+            evicted, _ = self.values.popitem(last=False)
+            self.n_bytes -= self.sizes.pop(evicted)
+
+    def _path(self, key):
+        # Returns the path of the file for `key`, or `None`.
+        if self.directory is None:
+            return None
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + '.p')
+
+
+def n_bytes(value):
+    """
+    Returns the approximate size in bytes of `value`.
+
+    Sizes of NumPy arrays of numbers, `Fraction` objects, and tuples,
+    lists, and object arrays of these are calculated. The sizes of
+    other objects are as reported by `sys.getsizeof`.
+    """
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return value.nbytes
+    if isinstance(value, (np.ndarray, tuple, list)):
+        return sys.getsizeof(value) + sum(n_bytes(x) for x in value)
+    if isinstance(value, Fraction):
+        return (sys.getsizeof(value) + sys.getsizeof(value.numerator)
+                + sys.getsizeof(value.denominator))
+    return sys.getsizeof(value)
+
+
+class ArrayCache(object):
+    """
+    A content-addressed cache of NumPy arrays in files, bounded in size.
+
+    Call `get(key, calculate)` to obtain the array for `key`, calling
+    `calculate()` only if the array is not cached. Arrays are saved in
+    NumPy's binary format, in files in `directory` named by a hash of
+    the key, and are loaded by memory mapping, read-only. When the total
+    size of the files exceeds `max_bytes`, the least recently used files
+    are deleted. Keys must have deterministic representations as
+    strings, as for `LRUCache`, and should include the version of the
+    code calculating the arrays.
+
+    The numbers of arrays calculated and loaded are counted in members
+    `n_calculated` and `n_loaded`.
+    """
+    def __init__(self, directory=DATA_DIR + 'cache/', max_bytes=2**32):
+        """
+        Creates the cache, using the files already in `directory`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.n_calculated = 0
+        self.n_loaded = 0
+
+    def get(self, key, calculate):
+        """
+        Returns the array for `key`, calculating it if necessary.
+        """
+        # The modification time of a file is its time of last use.
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        path = os.path.join(self.directory, digest + '.npy')
+        if os.path.exists(path):
+            os.utime(path)
+            self.n_loaded += 1
+            return np.load(path, mmap_mode='r')
+        array = np.asarray(calculate())
+        self.n_calculated += 1
+        temporary = path + '.tmp{}'.format(os.getpid())
+        with open(temporary, 'wb') as file:
+            np.save(file, array)
+        os.replace(temporary, path)
+        self._evict()
+        return array
+
+    def clear(self):
+        """
+        Deletes all files in the cache.
+        """
+        for path in self._paths():
+            os.remove(path)
+
+    def _paths(self):
+        # Returns the paths of the files in the cache.
+        return [os.path.join(self.directory, name)
+                    for name in os.listdir(self.directory)
+                    if name.endswith('.npy')]
+
+    def _evict(self):
+        # Deletes least recently used files until the size limit is met.
+        # Files may be deleted concurrently by other processes sharing
+        # the directory, and are skipped if not found.
+        stats = []
+        for path in self._paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stats.append((stat.st_mtime, stat.st_size, path))
+        stats.sort()
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,76 @@
+class ConvolutionOperator(object):
+    """
+    Applies the derivative operator W by convolution, without forming W.
+
+    Off the main diagonal, element W[i,j] of the derivative operator is
+    `b[j] * kernel[n-1+i-j]`, where `kernel` is the truncated and
+    normalized distribution of mutational effects (see `Derivative`).
+    Thus the product of W and vector `s` is the convolution of `kernel`
+    with `b * s`, plus a diagonal correction times `s`. The convolution
+    is calculated by FFT in O(n log n) operations, rather than the
+    O(n**2) operations of the dense matrix product.
+
+    The FFT calculation is accurate relative to the largest element of
+    the convolution, not elementwise. Elements of the convolution for
+    which the error bound exceeds `rtol` times the calculated value are
+    calculated anew as dot products, as in `fft_convolve`. Thus elements
+    many orders of magnitude smaller than the largest, e.g., frequencies
+    in the infinite-population model, are calculated accurately, and are
+    not negative.
+
+    Rows of the operator are zeroed by calling `zero_rows`. Multiply
+    the operator by a vector using the `@` operator, as for an array.
+    """
+    def __init__(self, W, d=0.0, rtol=1e-12):
+        """
+        Prepares the convolution form of the derivative operator.
+
+        Parameter `W` is an instance of `Derivative`, and `d` is the
+        death-rate parameter, subtracted from the main diagonal. The
+        relative tolerance `rtol` is as for `fft_convolve`.
+        """
+        # Circular convolution of length at least 2n - 1 yields elements
+        # n-1, ..., 2n-2 of the linear convolution of the length-(2n-1)
+        # kernel with a length-n vector, free of wraparound. The Fourier
+        # transform of the kernel is calculated once.
+        n = W.n
+        self.n = n
+        self.shape = (n, n)
+        self.b = W.b
+        self.fft_size = 2 ** math.ceil(math.log2(2*n - 1))
+        self.kernel = W.kernel
+        self.kernel_fft = np.fft.rfft(W.kernel, self.fft_size)
+        self.rtol = rtol
+        #
+        # The convolution contributes b[j] * kernel[n-1] to W[j,j]. The
+        # diagonal correction is what remains of the main diagonal.
+        self.diagonal = np.diagonal(W.M) - W.b * W.kernel[n-1] - d
+        self.zeroed = np.zeros(n, dtype=bool)
+
+    def __matmul__(self, s):
+        """
+        Returns the product of the operator and vector `s`.
+        """
+        # Element i of the convolution is the dot product of `x` with
+        # elements i, ..., i + n - 1 of the kernel, reversed. Inaccurate
+        # elements are calculated anew, omitting the rows that are zeroed.
+        n = self.n
+        x = self.b * s
+        spectrum = self.kernel_fft * np.fft.rfft(x, self.fft_size)
+        product = np.fft.irfft(spectrum, self.fft_size)[n-1:2*n-1]
+        def direct(i0, i1):
+            return np.convolve(x, self.kernel[i0:i1+n-1], 'valid')
+        bound = fft_error_bound(self.fft_size, self.kernel, x)
+        product = recalculate_inaccurate(product, bound, self.rtol, direct,
+                                         self.zeroed)
+        product += self.diagonal * s
+        product[self.zeroed] = 0.0
+        return product
+
+    def zero_rows(self, rows):
+        """
+        Zeroes the rows of the operator indicated by Boolean array `rows`.
+
+        Rows that were zeroed previously remain zeroed.
+        """
+        self.zeroed |= rows
\ No newline at end of file
@@ -7,19 +7,30 @@ class Derivative(object):
     obtained by calling the instance, e.g., `W()` or `W(d=0.1)`. The
     latter example shows how to change the value of d (not recommended).
     """
-    def __init__(self, q, n):
+    def __init__(self, q, n, parent=None):
         """
         Calculates derivative operator W, assuming death rates of zero.
                 
         Parameters
-        `q` : distribution of probability over mutational effects
-        `n` : number of types (less than `q.K`)
+        `q`      : distribution of probability over mutational effects
+        `n`      : number of types (less than `q.K`)
+        `parent` : optional instance of this class for `q` and at least
+                   `n` types, from which the operator is derived
+        
+        The operator derived from `parent` is equal, within rounding
+        error, to the operator calculated from `q`, and is obtained with
+        fewer operations.
         """
+        if parent is not None:
+            self._nest(parent, n)
+            return
         # Truncate q to the 2n - 1 elements centered on q[q.K]. Then the
         # columns of F are, from left to right, the length-n spans of q,
         # from right to left. The j-th column of M is initially set to
         # the j-th column of F, scaled by b[j]. Then M[j,j] is adjusted 
-        # to make the column sum equal to b[j].
+        # to make the column sum equal to b[j]. The truncated q is kept
+        # as `kernel`: off the main diagonal, M[i,j] is b[j] times
+        # kernel[n-1+i-j], so M is a Toeplitz matrix times diag(b).
         b = equispaced(n, spacing=q.w, start='0').astype(float)
         self.q = q
         q = q[q.K-(n-1):q.K+n]
@@ -30,7 +41,29 @@ class Derivative(object):
         self.M[np.diag_indices(n)] += b - colsums
         self.n = n
         self.b = b
+        self.kernel = q
         
+    def _nest(self, parent, n):
+        # The truncated q for n types is the middle 2n - 1 elements of
+        # the parent's kernel, renormalized. Thus the off-diagonal part
+        # of M is the leading n-by-n submatrix of the parent's M, scaled
+        # by the reciprocal of the sum of those kernel elements. The main
+        # diagonal is calculated as in `__init__`, with the column sums
+        # calculated by compensated summation.
+        N = parent.n
+        assert n <= N
+        kernel = parent.kernel[N-n:N+n-1]
+        total = math.fsum(kernel)
+        self.q = parent.q
+        self.n = n
+        self.b = parent.b[:n]
+        self.kernel = kernel / total
+        self.M = parent.M[:n,:n] / total
+        diag_indices = np.diag_indices(n)
+        self.M[diag_indices] = self.b * self.kernel[n-1]
+        colsums = compensated_dot(self.M.T, np.ones(n))
+        self.M[diag_indices] += self.b - colsums
+
     def __call__(self, d=0.0):
         """
         Returns the derivative operator as a square array of floats.
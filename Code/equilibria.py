@@ -1,3 +1,9 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
+
+
 class Equilibria(object):
     """
     Container for a 3-D array of equilibrium distributions.
@@ -8,50 +14,154 @@ class Equilibria(object):
     * the genomic mutation rate.
     
     Equilibria are calculated with death rate parameter `d` set to zero.
+    The calculations for the cells of the array are independent, and
+    may be distributed over a pool of worker processes.
     """    
+    # All equilibria are calculated on initialization.
+    lazy = False
+
     def __init__(self, gammas=['1e-3', '1e-6', '1e-9'],
                        b_maxes=['0.15', '0.2', '0.25'],
                        mus=['1', '0.1'],
                        log_L=14,
-                       Params=Parameters):
+                       w='5e-4',
+                       processes=1,
+                       blas_threads=None,
+                       dominant=False,
+                       warm_start=False,
+                       nested=False):
         """
         Create array of equilibria, and calculate associated statistics.
         
         Parameters
-        * `gammas` : weightings of beneficial mutational effects
-        * `b_maxes`: upper limits on the birth rate parameter
-        * `mus`    : genomic mutation rates
-        * `log_L`  : base-2 logarithm (an integer) of the number of loci
-        * `Params` : subclass of `Parameters`
+        * `gammas`      : weightings of beneficial mutational effects
+        * `b_maxes`     : upper limits on the birth rate parameter
+        * `mus`         : genomic mutation rates
+        * `log_L`       : base-2 logarithm (an integer) of the number of
+                          loci
+        * `w`           : bin width (exact)
+        * `processes`   : number of worker processes calculating cells
+                          of the array (none if 1)
+        * `blas_threads`: number of BLAS threads in each worker process
+                          (by default, the number of CPUs divided by the
+                          number of processes)
+        * `dominant`    : determines whether only the dominant eigenpair
+                          is approximated initially (see `Equilibrium`)
+        * `warm_start`  : determines whether the equilibrium for each
+                          upper limit on the birth rate parameter is
+                          the initial approximation of the equilibrium
+                          for the next lower limit
+        * `nested`      : determines whether the derivative operator for
+                          the greatest upper limit is calculated, and
+                          the operators for lesser limits are derived
+                          from it (see `Derivative`)
         
         The `gammas` must be integer powers of 2 or 10. Setting `log_L`
-        greater than 14 has very little effect on the results.
+        greater than 14 has very little effect on the results. Worker
+        processes are forked, and thus are not available on platforms
+        that only spawn processes.
         """
         # Create arrays to hold results, with rows corresponding to
         # probability distributions over mutational effects, and columns
         # corresponding to upper limits on birth parameter.
         m, n, k = len(gammas), len(b_maxes), len(mus)
-        self.params = np.empty((m, n, k), dtype=object)
+        self.gammas, self.mus, self.log_L, self.w = gammas, mus, log_L, w
+        self.processes, self.blas_threads = processes, blas_threads
+        self.dominant, self.warm_start = dominant, warm_start
+        self.nested = nested
+        self.q = np.empty((m, k), dtype=object)
         self.eq = np.empty((m, n, k), dtype=object)
-        self.e_value = np.empty((m, n, k))
-        self.eigen_error = np.empty((m, n, k))
-        self.mean = np.empty((m, n, k))
-        self.var = np.empty((m, n, k))
+        self.e_value = np.full((m, n, k), np.nan)
+        self.eigen_error = np.full((m, n, k), np.nan)
+        self.mean = np.full((m, n, k), np.nan)
+        self.var = np.full((m, n, k), np.nan)
+        self.calculated = np.zeros((m, n, k), dtype=bool)
+        #
+        # Determine the numbers of types, and the birth rate parameters,
+        # for the upper limits on the birth rate parameter. The number
+        # of points in each tail of the distributions over mutational
+        # effects is somewhat greater than the largest number of types.
+        n_types = to_fraction(b_maxes) / exactly(w) + 1
+        assert all(n.denominator == 1 for n in n_types)
+        self.n_types = [n.numerator for n in n_types]
+        self.b = [equispaced(n, spacing=w) for n in self.n_types]
+        self.K = 5 * max(self.n_types) // 4 + 1
+        if not self.lazy:
+            self._calculate(np.ndindex(m, n, k))
+
+    def _calculate(self, cells):
+        """
+        Calculates the equilibria for the given cells, if not done yet.
+        """
+        # Calculate the distribution over mutational effects for each
+        # pair of gamma and mu, and share it with the cells for all of
+        # the upper limits on the birth rate parameter. The cells are
+        # calculated in chains, each with a single pair, in decreasing
+        # order of the number of types. With warm starts or nesting, a
+        # chain holds all cells for its pair. Then the equilibrium for
+        # each cell is the initial approximation for the next, or the
+        # derivative operator for the first cell is the parent of the
+        # operators for the others. Otherwise, each chain holds one
+        # cell. Calculate the chains with the most types first, to
+        # balance the load on the worker processes.
+        cells = [cell for cell in cells if not self.calculated[cell]]
+        if len(cells) == 0:
+            return
+        n_types = self.n_types
+        cells.sort(key=lambda cell: -n_types[cell[1]])
+        pairs = sorted({(i, k) for i, j, k in cells})
+        new_pairs = [(i, k) for i, k in pairs if self.q[i,k] is None]
+        if self.warm_start or self.nested:
+            chains = [[(i, j, k) for i, j, k in cells if (i, k) == pair]
+                          for pair in pairs]
+        else:
+            chains = [[cell] for cell in cells]
+        chains.sort(key=lambda chain: -n_types[chain[0][1]])
+        cells = [cell for chain in chains for cell in chain]
+        args = (self.dominant, self.warm_start, self.nested)
+        if self.processes == 1:
+            for i, k in new_pairs:
+                self.q[i,k] = _sanford(self.K, self.w, self.gammas[i],
+                                       self.mus[k], self.log_L)
+            results = [_equilibria(self.q[chain[0][0],chain[0][2]],
+                                   [n_types[j] for i, j, k in chain], *args)
+                           for chain in chains]
+        else:
+            # Calculate the single-locus DFE for each gamma before the
+            # worker processes are forked, so that they find the DFEs in
+            # the cache (see `Sanford`), rather than each calculating
+            # them.
+            for i in sorted({i for i, k in new_pairs}):
+                Sanford.single_locus_dfe(self.K, self.w, self.gammas[i])
+            blas_threads = self.blas_threads
+            if blas_threads is None:
+                blas_threads = max(1, os.cpu_count() // self.processes)
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(self.processes, context,
+                                     _limit_blas_threads,
+                                     (blas_threads,)) as pool:
+                futures = [pool.submit(_sanford, self.K, self.w,
+                                       self.gammas[i], self.mus[k],
+                                       self.log_L) for i, k in new_pairs]
+                for (i, k), future in zip(new_pairs, futures):
+                    self.q[i,k] = future.result()
+                futures = [pool.submit(_equilibria,
+                                       self.q[chain[0][0],chain[0][2]],
+                                       [n_types[j] for i, j, k in chain],
+                                       *args)
+                           for chain in chains]
+                results = [future.result() for future in futures]
+        results = [result for chain in results for result in chain]
         #
-        # Calculate equilibria along with means/variances of fitnesses,
-        # with death parameter `d` set to zero.
-        for i, gamma in enumerate(gammas):
-            for j, b_max in enumerate(b_maxes):
-                for k, mu in enumerate(mus):
-                    params = Params(b_max, d='0', mu=mu, gamma=gamma,
-                                    log_L=log_L)
-                    self.params[i,j,k] = params
-                    e_value, e_vector, error = equilibrium(params.B())
-                    self.e_value[i,j,k] = e_value
-                    self.eq[i,j,k] = e_vector
-                    self.eigen_error[i,j,k] = error
-                    mean, var = mean_var(self.eq[i,j,k], params.b)
-                    self.mean[i,j,k], self.var[i,j,k] = mean, var
+        # Store equilibria along with means/variances of fitnesses, with
+        # death parameter `d` set to zero.
+        for (i, j, k), (e_value, e_vector, error) in zip(cells, results):
+            self.e_value[i,j,k] = e_value
+            self.eq[i,j,k] = e_vector
+            self.eigen_error[i,j,k] = error
+            mean, var = mean_var(self.eq[i,j,k], self.b[j])
+            self.mean[i,j,k], self.var[i,j,k] = mean, var
+            self.calculated[i,j,k] = True
 
     def plot(self, text_loc=(0.05, 0.25), legend_loc=(0.05, 0.61), 
                    fontsize=9, **kwargs):
@@ -83,10 +193,10 @@ class Equilibria(object):
                                          sharex='col', sharey='row')
         for i in range(m):
             for j in range(n):
-                for params, eq in zip(self.params[i,j], self.eq[i,j]):
-                    label = '$\\mu={:3.1f}$'.format(float(params.mu))
-                    self.ax[i,j].plot(params.b, eq, label=label, lw=1)
-            gamma = exp_latex(self.params[i,0,0].gamma, '\gamma=')
+                for mu, eq in zip(self.mus, self.eq[i,j]):
+                    label = '$\\mu={:3.1f}$'.format(float(mu))
+                    self.ax[i,j].plot(self.b[j], eq, label=label, lw=1)
+            gamma = exp_latex(self.q[i,0].gamma, '\gamma=')
             ax = self.ax[i,0]
             ax.text(*text_loc, gamma, transform=ax.transAxes, bbox=None, 
                     fontsize=fontsize, verticalalignment='top')
@@ -114,4 +224,79 @@ class Equilibria(object):
         * the corresponding mean value of the birth rate parameter, and
         * the corresponding variance in birth rate parameter. 
         """
-        return self.eq[key], self.mean[key], self.var[key]
\ No newline at end of file
+        return self.eq[key], self.mean[key], self.var[key]
+
+
+class LazyEquilibria(Equilibria):
+    """
+    Container for a 3-D array of equilibria, calculated as needed.
+    
+    Initialization returns immediately. An equilibrium is calculated on
+    the first access by indexing or iteration, and is kept for later
+    accesses. The Boolean array `calculated` indicates which equilibria
+    have been calculated. Elements of arrays `eq`, `e_value`, etc., for
+    the others are `None` or NaN. Pickling the instance saves only the
+    equilibria calculated thus far.
+    """
+    # No equilibria are calculated on initialization.
+    lazy = True
+
+    def plot(self, *args, **kwargs):
+        """
+        Calculates all equilibria, and plots them (see `Equilibria`).
+        """
+        self._calculate(np.ndindex(self.eq.shape))
+        super().plot(*args, **kwargs)
+
+    def __getitem__(self, key):
+        """
+        Returns tuple of equilibrium distribution and associated stats.
+        
+        The equilibria indexed by `key` are calculated as needed. See
+        `Equilibria` for the elements of the tuple.
+        """
+        cells = np.arange(self.eq.size).reshape(self.eq.shape)[key]
+        cells = np.unravel_index(np.ravel(cells), self.eq.shape)
+        self._calculate(zip(*cells))
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        """
+        Iterates over the cells of the array in row-major order.
+        
+        The tuple for each cell is the same as for indexing, and the
+        equilibrium is calculated as needed.
+        """
+        for cell in np.ndindex(self.eq.shape):
+            yield self[cell]
+
+
+def _limit_blas_threads(n_threads):
+    # Limits the number of BLAS threads in a worker process.
+    threadpool_limits(n_threads)
+
+
+def _sanford(K, w, gamma, U, log_L):
+    # Returns the distribution over mutational effects for a pair of
+    # gamma and U.
+    return Sanford(K, w, gamma, U=U, log_L=log_L)
+
+
+def _equilibria(q, ns, dominant, warm_start, nested):
+    # Returns the eigenvalue, equilibrium distribution, and MARE for the
+    # derivative operator with each number of types in `ns`. With warm
+    # starts, each equilibrium is the initial approximation for the
+    # next. With nesting, the first operator is the parent of the
+    # others. Instances of `Equilibrium`, with their n-by-n matrices,
+    # are not returned from worker processes.
+    results = []
+    initial = parent = None
+    for n in ns:
+        eq = Equilibrium(q, n, dominant=dominant, initial=initial,
+                         parent=parent)
+        results.append((eq.e_value, eq.eq, eq.mare))
+        if warm_start:
+            initial = eq.eq
+        if nested and parent is None:
+            parent = eq
+    return results
\ No newline at end of file
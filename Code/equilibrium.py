@@ -0,0 +1,125 @@
+class Equilibrium(Derivative):
+    """
+    The equilibrium distribution for a derivative operator.
+
+    The equilibrium is the eigenvector, normalized to sum to 1, that is
+    associated with the largest real eigenvalue of the derivative
+    operator with death rate d = 0. It is obtained by indexing the
+    instance. Members `e_value` and `mare` are the eigenvalue and the
+    maximum absolute relative error in the eigenpair calculation. Member
+    `warm_started` indicates whether a supplied initial approximation
+    met the error target, so that no library routine was called.
+    """
+    def __init__(self, q, n, n_iterations=5, dominant=False,
+                       tolerance=None, initial=None, target=1e-14,
+                       parent=None):
+        """
+        Calculate the equilibrium distribution.
+
+        Parameters `q`, `n`, and `parent` are as for `Derivative`. A rough
+        approximation, obtained using a library routine, is improved by
+        `n_iterations` of the inverse power method. If `dominant` is
+        true, then the approximate eigenvector is obtained instead by
+        inverse iteration with a shift greater than all eigenvalues (see
+        `dominant_real_eig`). This is faster, and uses less memory. But
+        if the iteration fails, then `dominant_real_eig` falls back on
+        the library routine.
+        If `tolerance` is given, then the approximation is improved by
+        Rayleigh-quotient iteration until the maximum absolute relative
+        error is no greater than `tolerance` (see
+        `rayleigh_quotient_iteration`), rather than by `n_iterations`.
+
+        If `initial` is given, e.g., the equilibrium for a neighboring
+        set of parameters, then it is improved by at most 4 *
+        `n_iterations` of `perron_iteration`, instead of the approximation
+        obtained using the library routine, until the maximum absolute
+        relative error is no greater than `tolerance` (1e-14 if not
+        given). The result is kept if its maximum absolute relative error
+        is no greater than `target`, and none of its elements is
+        negative. The length of `initial` need not be `n`, but `initial`
+        is ignored if its length is less than 2. Equilibria for
+        different upper limits on the birth rate, with the same bin
+        width, are nearly similar in shape: the peak lies at about the
+        same fraction of the upper limit, and the logarithms of the
+        elements are roughly proportional to the upper limit. Thus the
+        logarithm of `initial` is interpolated linearly at the same
+        fractions of the upper limit for `n` types, and is scaled by the
+        ratio of the upper limits.
+        """
+        # Started from the equilibrium for the neighbouring upper limit,
+        # aligned by birth rate or by upper limit, inverse iteration
+        # converges slowly, or converges to an eigenvector other than the
+        # equilibrium. From the rescaled equilibrium, `perron_iteration`
+        # converges in a few iterations, and is much faster than the
+        # library routine. It stops early when it is not converging.
+        # The off-diagonal elements of the derivative operator are
+        # nonnegative, and the equilibrium is its only nonnegative
+        # eigenvector, so a result with any negative element is rejected.
+        super().__init__(q, n, parent)
+        self.warm_started = False
+        if initial is not None and len(initial) >= 2:
+            tiny = np.finfo(float).tiny
+            log_initial = np.log(np.maximum(np.array(initial, dtype=float),
+                                            tiny))
+            m = len(log_initial)
+            if m != n:
+                log_initial = np.interp(np.linspace(0.0, 1.0, n),
+                                        np.linspace(0.0, 1.0, m),
+                                        log_initial) * (n - 1) / (m - 1)
+            e_vector = np.exp(log_initial - np.max(log_initial))
+            warm_tolerance = 1e-14 if tolerance is None else tolerance
+            result = perron_iteration(self.M, e_vector, warm_tolerance,
+                                      4 * n_iterations)
+            if result[2] <= target and np.all(result[1] >= 0.0):
+                self.e_value, self.eq, self.mare = result
+                self.warm_started = True
+                return
+        #
+        # Negate the elements of the initial eigenvector if the largest-
+        # magnitude element is negative. Then zero negative elements.
+        if dominant:
+            e_value, e_vector = dominant_real_eig(self.M)
+        else:
+            e_value, e_vector = largest_real_eig(self.M)
+        if e_vector[np.argmax(np.abs(e_vector))] < 0.0:
+            e_vector = -e_vector
+        e_vector[e_vector < 0.0] = 0.0
+        result = self._improve(e_vector, n_iterations, tolerance)
+        self.e_value, self.eq, self.mare = result
+
+    @classmethod
+    def from_coarse(cls, coarse, q, n, n_iterations=5, tolerance=None,
+                         target=1e-14):
+        """
+        Calculate the equilibrium, starting with a coarser equilibrium.
+
+        Parameter `coarse` is the equilibrium (an instance of this class)
+        for a greater bin width, e.g., 5e-4 rather than 5e-5. Its
+        logarithm is interpolated linearly at the birth rates of the
+        `n` types for distribution `q`, and the result is the initial
+        approximation (see `__init__`). The library routine is called
+        only if the improved approximation misses `target`, or has a
+        negative element, i.e., is not the equilibrium. Then member
+        `warm_started` of the returned instance is false.
+        """
+        # Interpolate the logarithm, because the elements of equilibria
+        # range over many orders of magnitude. The interpolated elements
+        # are normalized by the inverse power method.
+        b = equispaced(n, spacing=q.w).astype(float)
+        tiny = np.finfo(float).tiny
+        log_eq = np.log(np.maximum(coarse.eq.astype(float), tiny))
+        log_eq = np.interp(b, coarse.b, log_eq)
+        initial = np.exp(log_eq - np.max(log_eq))
+        return cls(q, n, n_iterations, tolerance=tolerance, initial=initial,
+                   target=target)
+
+    def _improve(self, e_vector, n_iterations, tolerance):
+        # Improve the approximate eigenvector, and return the eigenvalue,
+        # the eigenvector, and the maximum absolute relative error.
+        if tolerance is None:
+            return inverse_power(self.M, e_vector, n_iterations)
+        return rayleigh_quotient_iteration(self.M, e_vector, tolerance)
+
+    def __getitem__(self, key):
+        # Index the equilibrium distribution.
+        return self.eq[key]
\ No newline at end of file
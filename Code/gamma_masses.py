@@ -0,0 +1,67 @@
+from scipy import special
+
+# Cody-Waite split of log(2): the high part has trailing zeros in its
+# significand, so that its products with moderate integers are exact.
+_LOG2_HIGH = 6.93147180369123816490e-01
+_LOG2_LOW = 1.90821492927058770002e-10
+
+
+def gamma_bin_masses(beta, walls, rtol=1e-13):
+    """
+    Returns probability masses of the Gamma distribution within bins.
+    
+    The Gamma distribution has shape parameter 1/2 and rate parameter
+    `beta` (exact). For array `walls` of increasing positive (exact)
+    bin walls, the returned values are
+    * the mass below the first wall, i.e., the CDF at `walls[0]`, and
+    * the array of masses between consecutive walls.
+    Values are of type `Fraction`, though they are calculated
+    inexactly.
+    
+    The masses are calculated in 64-bit floating-point arithmetic, and
+    are not subject to underflow. The masses for which the estimated
+    relative error exceeds `rtol`, due to loss of precision in
+    differencing, are calculated anew by differencing multiprecision
+    values of the complementary CDF, with the precision increased by
+    the number of bits lost.
+    """
+    # With shape 1/2, the complementary CDF at wall x is erfc(sqrt(z)),
+    # with z = beta * x. Writing erfc(s) = erfcx(s) * exp(-s**2), the
+    # mass between walls x[i] and x[i+1] is
+    #
+    #     exp(-z[i]) * (erfcx(s[i]) - exp(-(z[i+1]-z[i])) * erfcx(s[i+1])),
+    #
+    # where the difference z[i+1] - z[i] is calculated exactly. Write
+    # exp(-z[i]) as 2**-k[i] * exp(-r[i]), with integer k[i] and with
+    # |r[i]| <= log(2) / 2 calculated accurately. Then the relative
+    # error of the mass depends on the ratio of the sum and difference
+    # of the terms in parentheses, but not on the magnitude of z[i].
+    beta = exactly(beta)
+    z_exact = beta * to_fraction(walls)
+    z = z_exact.astype(float)
+    z_low = (z_exact - to_fraction(z)).astype(float)
+    steps = (z_exact[1:] - z_exact[:-1]).astype(float)
+    k = np.round(z / math.log(2))
+    r = (z - k * _LOG2_HIGH) - k * _LOG2_LOW + z_low
+    s = np.sqrt(z)
+    erfcx = special.erfcx(s)
+    minuend = erfcx[:-1]
+    subtrahend = np.exp(-steps) * erfcx[1:]
+    difference = minuend - subtrahend
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cancellation = (minuend + subtrahend) / difference
+    error = 4 * np.finfo(float).eps * (cancellation + 2)
+    scaled_masses = np.exp(-r[:-1]) * difference
+    masses = np.array([Fraction(m) / 2**int(n)
+                           for m, n in zip(scaled_masses, k[:-1])])
+    #
+    # Recalculate inaccurate masses, including those that are not
+    # positive, using multiprecision arithmetic.
+    for i in np.flatnonzero(~(error <= rtol)):
+        extra_bits = 10
+        if difference[i] > 0:
+            extra_bits += math.ceil(math.log2(cancellation[i]))
+        with mp.workprec(mp.prec + extra_bits):
+            ccdf = mp_erfc(mp_sqrt(to_mpf(z_exact[i:i+2])))
+            masses[i] = to_fraction(ccdf[0] - ccdf[1])
+    return Fraction(special.erf(s[0])), masses
@@ -0,0 +1,155 @@
+class RungeKuttaSolver(Solver):
+    """
+    A solver applying an adaptive Runge-Kutta method of integration.
+
+    The embedded Dormand-Prince 5(4) method is applied, with the step
+    size adjusted to keep the estimated error of each step within the
+    given tolerance, relative to the largest frequency. Steps are
+    shortened as necessary to end exactly at the end of each year. As
+    in `Solver`, frequencies are set to zero when they fall below the
+    threshold, and subsequently are held at zero. The threshold is
+    applied after each accepted step. A `RuntimeError` is raised if the
+    step size falls below 16 times the machine epsilon, as it does when
+    the estimated errors are not finite.
+
+    The numbers of accepted steps, rejected steps, and products of the
+    derivative operator with vectors are counted in members `n_steps`,
+    `n_rejected`, and `n_products`.
+    """
+    # Coefficients of the Dormand-Prince method: the matrix `_A`, the
+    # weights `_B` of the 5th-order solution, and the differences `_E` of
+    # those weights and the weights of the 4th-order solution. The nodes
+    # are not needed, because the derivatives do not depend on time.
+    _A = [[],
+          [1/5],
+          [3/40, 9/40],
+          [44/45, -56/15, 32/9],
+          [19372/6561, -25360/2187, 64448/6561, -212/729],
+          [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+          [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+    _B = [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0]
+    _E = [71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40]
+
+    def __init__(self, W, initial_freqs, log_steps_per_year=0,
+                       threshold=1e-9, tolerance=1e-10):
+        """
+        Initialize the solver.
+
+        The initial step size is `2**-log_steps_per_year`. Parameter
+        `tolerance` bounds the estimated error of each step, relative to
+        the largest frequency. Other parameters are as for `Solver`.
+        """
+        self.tolerance = tolerance
+        self.n_steps = 0
+        self.n_rejected = 0
+        self.n_products = 0
+        super().__init__(W, initial_freqs, log_steps_per_year, threshold)
+
+    def _derivatives(self, x):
+        # Returns the product of the restricted derivative operator and
+        # the restricted frequencies `x`.
+        self.n_products += 1
+        return self._W @ x
+
+    def _year(self):
+        """
+        Advances the solution by one year, in steps of adaptive size.
+        """
+        # The derivatives at the end of an accepted step are those at
+        # the beginning of the next step, unless frequencies are zeroed.
+        # A step shortened to end the year does not shorten the steps of
+        # the next year: the proposed step size is kept. A step with a
+        # non-finite error is rejected. An error is raised if the step
+        # size falls so low that the time advances by almost nothing.
+        t = 0.0
+        x = self.s[self._cols]
+        k = [self._derivatives(x)] + [None] * 6
+        min_step_size = 16 * np.finfo(float).eps
+        while t < 1.0:
+            if self.step_size < min_step_size:
+                raise RuntimeError('RungeKuttaSolver: step size {} too small'
+                                   ' in year {}'.format(self.step_size,
+                                                        self.year + 1))
+            h = min(self.step_size, 1.0 - t)
+            for i in range(1, 7):
+                dx = sum(a * k_j for a, k_j in zip(self._A[i], k) if a)
+                k[i] = self._derivatives(x + h * dx)
+            x_new = x + h * sum(b * k_j for b, k_j in zip(self._B, k) if b)
+            error = h * sum(e * k_j for e, k_j in zip(self._E, k) if e)
+            #
+            # Scale the estimated error by the tolerance, and adjust the
+            # step size accordingly. Accept the step if the scaled error
+            # is no greater than 1.
+            error = np.max(np.abs(error)) / (self.tolerance
+                                            * np.max(np.abs(x_new)))
+            if not np.isfinite(error):
+                self.step_size = 0.2 * h
+                self.n_rejected += 1
+                continue
+            factor = 0.9 * error**-0.2 if error > 0.0 else 5.0
+            step_size = h * min(5.0, max(0.2, factor))
+            if error > 1.0:
+                self.step_size = step_size
+                self.n_rejected += 1
+                continue
+            if h < self.step_size:
+                step_size = max(step_size, self.step_size)
+            self.step_size = step_size
+            t += h
+            self.n_steps += 1
+            W = self._W
+            self.s[self._rows] = x_new
+            self._zero()
+            if self._W is W:
+                x, k[0] = x_new, k[6]
+            else:
+                x = self.s[self._cols]
+                k[0] = self._derivatives(x)
+
+
+class ExponentialSolver(Solver):
+    """
+    A solver applying the matrix exponential of the derivative operator.
+
+    Between zeroings of frequencies, the model is linear, with exact
+    solution `expm(h W) s` for time step h. Each step is a product of
+    the matrix exponential and the latest solution, and there is no
+    error of discretization, apart from the thresholding, for any step
+    size. Few steps per year are needed, e.g., `log_steps_per_year=0`.
+    As in `Solver`, frequencies are set to zero when they fall below
+    the threshold, and subsequently are held at zero.
+
+    The matrix exponential of the restricted derivative operator is
+    calculated with O(n**3) operations, and is calculated anew whenever
+    frequencies are zeroed. The number of steps taken is counted in
+    member `n_steps`.
+    """
+    # The matrix exponential is calculated when first needed, and is
+    # not saved.
+    _E = None
+    _unsaved = Solver._unsaved | {'_E'}
+
+    def __init__(self, W, initial_freqs, log_steps_per_year=0,
+                       threshold=1e-9):
+        """
+        Initialize the solver. Parameters are as for `Solver`.
+        """
+        self.n_steps = 0
+        super().__init__(W, initial_freqs, log_steps_per_year, threshold)
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator, and discards the exponential.
+        """
+        super()._restrict()
+        self._E = None
+
+    def _step(self):
+        """
+        Performs one step, multiplying by the matrix exponential.
+        """
+        if self._E is None:
+            self._E = linalg.expm(self.step_size * self._W)
+        self.s[self._rows] = self._E @ self.s[self._cols]
+        self.n_steps += 1
+        self._zero()
\ No newline at end of file
@@ -1,4 +1,4 @@
-def inverse_power(W, e_vector, n_iterations=5):
+def inverse_power(W, e_vector, n_iterations=5, update_shift=True):
     """
     Attempts to improve solution `e_vector` for an eigenvector of `W`.
         
@@ -8,7 +8,13 @@ def inverse_power(W, e_vector, n_iterations=5):
     * the maximum absolute error of `e_value * v` relative to `W @ v`.
         
     The given eigenvector is improved (ordinarily) by iterating the
-    inverse power method `n_iterations` times.
+    inverse power method `n_iterations` times. The shift subtracted from
+    the main diagonal of `W` is the best approximation of the eigenvalue
+    obtained thus far, if `update_shift` is true, and otherwise is the
+    Rayleigh quotient of the given eigenvector. The shifted matrix is
+    LU-factored once per shift, and the factorization is reused in
+    subsequent iterations. With `update_shift` false, just one
+    factorization is performed.
     """
     e_vector /= fsum(e_vector)
     best_e_vector = e_vector
@@ -16,23 +22,142 @@ def inverse_power(W, e_vector, n_iterations=5):
     A = np.array(W)
     diag_indices = np.diag_indices(A.shape[0])
     A[diag_indices] -= best_e_value
+    lu_and_piv = None
     #
-    # The inverse power method fails (and `solve` raises an exception)
-    # when subtraction of the approximate eigenvalue from the main
-    # diagonal of `W` produces a singular matrix. Suppress warnings
-    # from `solve`: they advise of possible numerical inaccuracy.
+    # The inverse power method fails when subtraction of the approximate
+    # eigenvalue from the main diagonal of `W` produces a singular
+    # matrix. Suppress warnings from the LU factorization: they advise
+    # of possible numerical inaccuracy.
     for _ in range(n_iterations):
         with warnings.catch_warnings():
             warnings.simplefilter('ignore')
             try:
-                e_vector = linalg.solve(A, e_vector)
-            except:
+                if lu_and_piv is None:
+                    lu_and_piv = linalg.lu_factor(A)
+                e_vector = linalg.lu_solve(lu_and_piv, e_vector)
+            except (ValueError, linalg.LinAlgError):
                 break
+        if not np.all(np.isfinite(e_vector)):
+            break
         e_vector /= fsum(e_vector)
         e_value, error = rayleigh_quotient(W, e_vector)
         if error < best_error:
             best_error = error
             best_e_value = e_value
             best_e_vector = e_vector
-            A[diag_indices] = W[diag_indices] - best_e_value
-    return best_e_value, best_e_vector, best_error
\ No newline at end of file
+            if update_shift:
+                A[diag_indices] = W[diag_indices] - best_e_value
+                lu_and_piv = None
+    return best_e_value, best_e_vector, best_error
+
+
+def rayleigh_quotient_iteration(W, e_vector, tolerance=1e-15,
+                                max_iterations=10):
+    """
+    Attempts to improve solution `e_vector` for an eigenvector of `W`.
+    
+    Returns the same values as `inverse_power`. The given eigenvector is
+    improved (ordinarily) by Rayleigh-quotient iteration, i.e., inverse
+    iteration with the shift set to the Rayleigh quotient of the latest
+    eigenvector in each iteration. Iteration stops when the maximum
+    absolute relative error is no greater than `tolerance`, when it
+    fails to decrease, or after `max_iterations` iterations.
+    """
+    # Convergence is ordinarily rapid, and the matrix is factored anew
+    # in each of the few iterations.
+    e_vector /= fsum(e_vector)
+    e_value, error = rayleigh_quotient(W, e_vector)
+    A = np.array(W)
+    diag_indices = np.diag_indices(A.shape[0])
+    for _ in range(max_iterations):
+        if error <= tolerance:
+            break
+        A[diag_indices] = W[diag_indices] - e_value
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            try:
+                next_e_vector = linalg.solve(A, e_vector)
+            except (ValueError, linalg.LinAlgError):
+                break
+        if not np.all(np.isfinite(next_e_vector)):
+            break
+        next_e_vector /= fsum(next_e_vector)
+        next_e_value, next_error = rayleigh_quotient(W, next_e_vector)
+        if not next_error < error:
+            break
+        e_value, e_vector, error = next_e_value, next_e_vector, next_error
+    return e_value, e_vector, error
+
+
+def perron_iteration(W, e_vector, tolerance=1e-14, max_iterations=20,
+                           max_factorizations=8):
+    """
+    Attempts to improve positive `e_vector` for the eigenvector of `W`
+    associated with its largest real eigenvalue.
+
+    Returns the same values as `inverse_power`. The off-diagonal
+    elements of `W` must be nonnegative, as are those of the derivative
+    operator. For positive vector `v`, the largest real eigenvalue of
+    `W` lies between the least and the greatest of the ratios of the
+    elements of `W @ v` to those of `v` (Collatz and Wielandt). Inverse
+    iteration is performed with the shift set to the greatest ratio for
+    some earlier iterate. Thus the shift is never less than the
+    eigenvalue, and the iterates remain positive, converging to the
+    eigenvector with no negative elements, rather than to another. The
+    shift is moved to the latest upper bound, and the shifted matrix is
+    factored anew, only when the bounds have closed to less than half of
+    the distance from the shift to the lower bound, or when they have
+    stalled, and at most `max_factorizations` times. The maximum absolute
+    relative error is calculated when the difference of the bounds is
+    small. Iteration stops when the error is no greater than
+    `tolerance`, when the difference of the bounds fails to fall by at
+    least 1 percent with a new shift (or with the last shift permitted),
+    when an element of the eigenvector is not positive, or after
+    `max_iterations` iterations.
+    """
+    # The bounds are calculated with an ordinary matrix product, which
+    # is much faster than the compensated product of the Rayleigh
+    # quotient, and the relative difference of the bounds is roughly
+    # the maximum absolute relative error. The rate of convergence is
+    # (shift - lambda_1) / (shift - lambda_2), so moving the shift pays
+    # for a factorization only when the upper bound has moved well
+    # toward the eigenvalue. A reduction of the difference by less than
+    # 1 percent means that hundreds of iterations are required.
+    e_vector = e_vector / fsum(e_vector)
+    A = -np.array(W)
+    diag_indices = np.diag_indices(A.shape[0])
+    spread = shift = np.inf
+    n_factorizations = 0
+    refactored = False
+    for _ in range(max_iterations):
+        if not np.all(e_vector > 0.0):
+            break
+        ratios = (W @ e_vector) / e_vector
+        lower, upper = np.min(ratios), np.max(ratios)
+        next_spread = (upper - lower) / max(abs(upper), abs(lower))
+        if next_spread <= 1e3 * tolerance:
+            e_value, error = rayleigh_quotient(W, e_vector)
+            if error <= tolerance:
+                return e_value, e_vector, error
+        stalled = not next_spread < 0.99 * spread
+        if stalled and (refactored or n_factorizations == max_factorizations):
+            break
+        spread = next_spread
+        refactored = (n_factorizations < max_factorizations
+                      and (stalled or upper - lower < 0.5 * (shift - lower)))
+        if refactored:
+            shift = upper
+            A[diag_indices] = shift - W[diag_indices]
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                try:
+                    lu_and_piv = linalg.lu_factor(A)
+                except (ValueError, linalg.LinAlgError):
+                    break
+            n_factorizations += 1
+        e_vector = linalg.lu_solve(lu_and_piv, e_vector)
+        if not np.all(np.isfinite(e_vector)):
+            break
+        e_vector /= fsum(e_vector)
+    e_value, error = rayleigh_quotient(W, e_vector)
+    return e_value, e_vector, error
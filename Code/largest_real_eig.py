@@ -16,4 +16,62 @@ def largest_real_eig(W):
     largest = np.argmax(e_values.real)
     e_value = e_values[largest].real
     e_vector = e_vectors[:,largest].real
-    return e_value, e_vector
\ No newline at end of file
+    return e_value, e_vector
+
+
+def dominant_real_eig(W, tolerance=1e-14, max_iterations=100):
+    """
+    Returns largest real eigenvalue of `W` and associated eigenvector.
+    
+    The off-diagonal elements of `W` must be nonnegative, as are those of
+    the derivative operator. The eigenvector is obtained by inverse
+    iteration, starting with a vector of ones, with shift sigma greater
+    than every eigenvalue of `W`, and with the matrix factored just once.
+    When the bounds on the eigenvalue (see `perron_iteration`) differ by
+    less than half of the greater, the approximation is improved by
+    `perron_iteration`, with the shift moved to the upper bound in each
+    iteration, until the maximum absolute relative error is no greater
+    than `tolerance`. Each stage is limited to `max_iterations`
+    iterations, and the second to a few factorizations of the matrix.
+    If either stage fails, then the result of `largest_real_eig(W)` is
+    returned.
+    """
+    # The eigenvalues of `W` lie in the union of the Gershgorin discs
+    # for its columns, so no real part exceeds the greatest of the sums
+    # of elements of the columns. With sigma greater than that sum, the
+    # matrix sigma I - W is an M-matrix, and its inverse is nonnegative.
+    # The dominant eigenvalue of the inverse is 1 / (sigma - lambda),
+    # where lambda is the largest real eigenvalue of `W`, and the only
+    # nonnegative eigenvector is the one associated with lambda. Thus
+    # iteration with the nonnegative inverse converges to it from the
+    # positive vector of ones. But sigma may be far from lambda, and
+    # convergence is then slow, e.g., a reduction of the error by a
+    # factor of only 0.993 per iteration when gamma is 1e-9. The cheap
+    # iterations of the first stage bring the approximation near enough
+    # for the shift to be moved close to lambda.
+    n = W.shape[0]
+    bound = np.max(np.sum(W, axis=0))
+    sigma = bound + np.sqrt(np.finfo(float).eps) * max(abs(bound), 1.0)
+    A = -np.array(W)
+    A[np.diag_indices(n)] += sigma
+    e_vector = np.ones(n) / n
+    try:
+        lu_and_piv = linalg.lu_factor(A)
+    except (ValueError, linalg.LinAlgError):
+        return largest_real_eig(W)
+    for _ in range(max_iterations):
+        e_vector = linalg.lu_solve(lu_and_piv, e_vector)
+        e_vector /= fsum(e_vector)
+        if not np.all(np.isfinite(e_vector) & (e_vector > 0.0)):
+            return largest_real_eig(W)
+        ratios = (W @ e_vector) / e_vector
+        lower, upper = np.min(ratios), np.max(ratios)
+        if upper - lower < 0.5 * max(abs(upper), abs(lower)):
+            break
+    else:
+        return largest_real_eig(W)
+    e_value, e_vector, error = perron_iteration(W, e_vector, tolerance,
+                                                max_iterations)
+    if error <= tolerance and np.all(e_vector > 0.0):
+        return e_value, e_vector
+    return largest_real_eig(W)
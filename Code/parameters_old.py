@@ -8,9 +8,10 @@ class Parameters(object):
     
     There are correspondingly named members for scalar parameters n,
     d, w, gamma, beta, and mu; and for vectorial parameters b and m.
-    The base-2 logarithm of the number L of loci, an integer power of 2,
-    is assigned to member `log_L`. All numbers other than integers `n`
-    and `log_L` are represented exactly as objects in class `Fraction`. 
+    The number L of loci, a positive integer or infinity, is assigned to
+    member `L`, and its base-2 logarithm to member `log_L`. All numbers
+    other than `n`, `L`, and `log_L` are represented exactly as objects
+    in class `Fraction`. 
     """
     # Numerical accuracy is of great concern. The general strategy is to
     # do exact calculations with rational numbers (Python type Fraction)
@@ -19,12 +20,18 @@ class Parameters(object):
     # of numbers with itself is practical only with 64-bit floating-point
     # numbers.
     #
+    # Method of convolution passed to `convolve_same`: 'direct' or 'fft'.
+    # The DFE is calculated in floating-point by `gamma_bin_masses`,
+    # unless `multiprecision_dfe` is true.
+    convolution = 'direct'
+    multiprecision_dfe = False
+
     def __init__(self, b_max='0.25', d='0.1', w='5e-4', gamma='1e-3',
-                       beta='500.0', mu='1.0', log_L=0):
+                       beta='500.0', mu='1.0', log_L=0, L=None):
         """
         Sets elementary parameters of the infinite-population model.
                 
-        Parameters (all but the last are given as strings)
+        Parameters (all but the last two are given as strings)
         `b_max`: maximum birth parameter, evenly divisible by `w`
         `d`    : death parameter
         `w`    : bin width
@@ -33,14 +40,22 @@ class Parameters(object):
         `beta` : rate parameter of the Gamma distribution (with shape
                  parameter alpha=0.5) in Sanford's DFE
         `mu`   : probability that mutation occurs in an offspring
-        `log_L`: base-2 logarithm of the number of loci in genotypes
+        `log_L`: base-2 logarithm (an integer) of the number of loci in
+                 genotypes, or `np.inf` for the limit of infinitely
+                 many loci
+        `L`    : number of loci (a positive integer, or `np.inf`),
+                 overriding `log_L` if given
         
         Default settings come from Section 5 of Basener and Sanford.
         """
         # Verify that all non-integer arguments are given as strings.
         args = [b_max, d, w, gamma, beta, mu]
         assert all(isinstance(x, str) for x in args)
-        self.log_L = log_L
+        if L is None:
+            L = 2**log_L
+        else:
+            log_L = math.log2(L)
+        self.L, self.log_L = L, log_L
         #
         # Convert parameters to Fraction objects.
         self.d = Fraction(d)
@@ -157,19 +172,28 @@ class Parameters(object):
         
         The distribution is derived from the L-fold convolution of the
         distribution over possible effects of mutation on fitness at each
-        of L loci, where L is 2**`self.log_L`. The result depends on the
-        per-locus mutation rate, `self.mu`/L, and the distribution of
-        fitness effects for a single mutation, calculated by instance
-        function `dfe()`.
+        of L = `self.L` loci. The result depends on the per-locus
+        mutation rate, `self.mu`/L, and the distribution of fitness
+        effects for a single mutation, calculated by instance function
+        `dfe()`. If L is infinite, the result is the limiting compound
+        Poisson distribution.
         
         The probability distribution is represented as an array of 2n - 1
         positive numbers of type Fraction, where n is the number of
         classes, `self.n`. The numbers sum exactly to 1. The probability
         of fitness difference m[i] - m[j] is indexed (i - j) + (n - 1).
         """
-        # Convert mutation rate for the entire genome to mutation rate at
+        # If L is infinite, then the distribution is the limit as L goes
+        # to infinity, a compound Poisson distribution with mean number
+        # `self.mu` of mutations (see `compound_poisson`). Otherwise,
+        # convert mutation rate for the entire genome to mutation rate at
         # each of the L loci.
-        mu = self.mu / 2**self.log_L
+        if self.L == np.inf:
+            dfe = self.dfe(2*self.n).astype(float)
+            q = compound_poisson(dfe, float(self.mu), self.convolution)
+            self._convolution_mass = np.empty(1)
+            return self._trimmed(to_fraction(q))
+        mu = self.mu / self.L
         #
         # The distribution of probability over fitness (non)changes due
         # to (non)mutation at a single locus is an array of 4n - 1
@@ -185,15 +209,26 @@ class Parameters(object):
         # 4n - 1 elements, the sum of which is stored as an element of
         # array `self._convolution_mass` to facilitate validation of the
         # code. Work with 64-bit floats, and convert the numbers in the
-        # final distribution to type Fraction.
-        self._convolution_mass = np.empty(self.log_L+1)
-        if self.log_L > 0:
+        # final distribution to type Fraction. If L is not a power of 2,
+        # then the L-fold convolution is calculated instead by
+        # `convolution_power`, and only the mass of the final
+        # distribution is stored.
+        log_L = round(self.log_L)
+        if self.L != 2**log_L:
+            q = convolution_power(q.astype(float), self.L, self.convolution)
+            self._convolution_mass = np.empty(1)
+            return self._trimmed(to_fraction(q))
+        self._convolution_mass = np.empty(log_L+1)
+        if log_L > 0:
             q = q.astype(float)
-            for i in range(self.log_L):
-                q = np.convolve(q, q, 'same')
+            for i in range(log_L):
+                q = convolve_same(q, q, self.convolution)
                 self._convolution_mass[i] = fsum(q)
                 q /= self._convolution_mass[i]
             q = to_fraction(q)
+        return self._trimmed(q)
+
+    def _trimmed(self, q):
         # Trim excess elements from the tails of the distribution, 
         # reducing the number of elements to 2n - 1, and then normalize.
         # The mass of the unnormalized distribution (with tails trimmed)
@@ -201,7 +236,7 @@ class Parameters(object):
         excess = (len(q) - (2 * self.n - 1)) // 2
         q = q[excess:-excess]
         assert len(q) == 2 * self.n - 1, 'q: Bad length of result'
-        q_norm = sum(q)
+        q_norm = fsum(q)
         self._convolution_mass[-1] = q_norm
         q /= q_norm
         return q
@@ -262,16 +297,23 @@ class Parameters(object):
         # calculation of the square root and the erfc functions is done
         # in floating-point arithmetic, with precision determined by the
         # `mpmath` context in which this method is called. The results
-        # are converted exactly to Fractions.
+        # are converted exactly to Fractions. Alternatively, calculate
+        # the masses in 64-bit floating-point, escalating to `mpmath`
+        # only for masses that lose precision in differencing.
         walls = self.w * np.arange(n) + self.w / 2
-        z = to_mpf(self.beta*walls)
-        comp_cdf = to_fraction(mp_erfc(mp_sqrt(z)))
+        if self.multiprecision_dfe:
+            z = to_mpf(self.beta*walls)
+            comp_cdf = to_fraction(mp_erfc(mp_sqrt(z)))
+            mass_at_zero = 1 - comp_cdf[0]
+            #
+            # Calculate unweighted bin masses by differencing the comple-
+            # mentary CDF at the bin walls.
+            masses = comp_cdf[:-1] - comp_cdf[1:]
+        else:
+            mass_at_zero, masses = gamma_bin_masses(self.beta, walls)
         #
-        # Calculate unweighted bin masses by differencing the comple-
-        # mentary CDF at the bin walls. If any of the masses is zero, then
-        # there was insufficient precision in the calculation of the
-        # complementary CDF.
-        masses = comp_cdf[:-1] - comp_cdf[1:]
+        # If any of the masses is zero, then there was insufficient
+        # precision in the calculation of the complementary CDF.
         assert all(masses > 0), 'Insufficient precision in dfe()'
         #
         # Weight the (reversed) masses to obtain masses for the upper
@@ -282,9 +324,9 @@ class Parameters(object):
         # Assemble the masses into a single array, with the mass for
         # zero mutational effect in the middle. Conditionally normalize
         # the resulting distribution.
-        dfe = np.concatenate((lower_tail, [1-comp_cdf[0]], upper_tail))
+        dfe = np.concatenate((lower_tail, [mass_at_zero], upper_tail))
         if normed:
-            dfe /= sum(dfe)
+            dfe /= fsum(dfe)
         return dfe
 
     def normal_freqs(self, mean='0.044', std='0.005', as_float=True):
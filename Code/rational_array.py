@@ -0,0 +1,193 @@
+class RationalArray(object):
+    """
+    Compact representation of a 1-D array of rational numbers.
+
+    The numbers are represented exactly as integer numerators (Python
+    `int` objects, in an array of type `object`) over a single positive
+    integer denominator. Arithmetic on the numerators is vectorized, and
+    requires no calculation of greatest common divisors, in contrast to
+    arithmetic on arrays of `Fraction` objects. Sums and dot products are
+    exact.
+
+    An instance is created from an array of `Fraction` objects, integers,
+    or floats (see `from_floats`). Use `to_fraction` to convert back to an
+    array of `Fraction` objects, and `astype(float)` to convert to an
+    array of floats. Scalar operands of arithmetic operations may be
+    rational numbers, strings, or floats, which are converted exactly.
+    """
+    def __init__(self, a=(), denominator=None):
+        """
+        Create the array from `a`, or from numerators and a denominator.
+
+        If `denominator` is given, then the elements of `a` are the
+        integer numerators. Otherwise the elements of `a` are converted
+        to `Fraction` objects, and the denominator is the least common
+        multiple of their denominators.
+        """
+        if denominator is None:
+            a = to_fraction(np.ravel(np.asarray(a, dtype=object)))
+            denominator = math.lcm(*(x.denominator for x in a))
+            a = [x.numerator * (denominator // x.denominator) for x in a]
+        numerators = np.empty(len(a), dtype=object)
+        numerators[:] = [int(p) for p in a]
+        self.numerators, self.denominator = numerators, int(denominator)
+
+    @classmethod
+    def from_floats(cls, a):
+        """
+        Create the array from an array `a` of finite floats.
+
+        The conversion is exact. The denominator is a power of 2.
+        """
+        # Each float is m * 2**e, with integer m of at most 53 bits.
+        mantissas, exponents = np.frexp(np.asarray(a, dtype=float))
+        mantissas = np.ldexp(mantissas, 53).astype(np.int64)
+        exponents = np.where(mantissas == 0, 0, exponents - 53)
+        shift = int(np.min(exponents, initial=0))
+        numerators = [int(m) << int(e - shift)
+                          for m, e in zip(mantissas, exponents)]
+        return cls(numerators, 2**-shift)
+
+    def to_fraction(self):
+        """
+        Returns the array as an array of `Fraction` objects.
+        """
+        q = self.denominator
+        a = np.empty(len(self), dtype=object)
+        a[:] = [Fraction(p, q) for p in self.numerators]
+        return a
+
+    def astype(self, dtype):
+        """
+        Returns the array as a NumPy array of the given type.
+
+        Conversion to floats is correctly rounded.
+        """
+        if dtype is float:
+            q = self.denominator
+            return np.array([p / q for p in self.numerators])
+        return self.to_fraction().astype(dtype)
+
+    def sum(self):
+        """
+        Returns the exact sum of the elements, a `Fraction`.
+        """
+        return Fraction(sum(self.numerators), self.denominator)
+
+    def dot(self, other):
+        """
+        Returns the exact dot product with `other`, a `Fraction`.
+        """
+        other = _rational_array(other)
+        return Fraction(int(np.dot(self.numerators, other.numerators)),
+                        self.denominator * other.denominator)
+
+    def normalized(self):
+        """
+        Returns the array scaled to sum to 1.
+        """
+        # The denominator is positive, so a negative sum is moved into
+        # the numerators.
+        total = sum(self.numerators)
+        if total == 0:
+            raise ZeroDivisionError('RationalArray: division by zero')
+        sign = -1 if total < 0 else 1
+        return RationalArray(sign * self.numerators, sign * total)
+
+    def reduced(self):
+        """
+        Returns the array with numerators and denominator in lowest terms.
+        """
+        divisor = math.gcd(self.denominator, *self.numerators)
+        return RationalArray(self.numerators // divisor,
+                             self.denominator // divisor)
+
+    def __add__(self, other):
+        other = _rational_array(other, len(self))
+        denominator = math.lcm(self.denominator, other.denominator)
+        p = self.numerators * (denominator // self.denominator)
+        q = other.numerators * (denominator // other.denominator)
+        return RationalArray(p + q, denominator)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return RationalArray(-self.numerators, self.denominator)
+
+    def __sub__(self, other):
+        return self + -_rational_array(other, len(self))
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        if _is_scalar(other):
+            other = _fraction(other)
+            return RationalArray(self.numerators * other.numerator,
+                                 self.denominator * other.denominator)
+        other = _rational_array(other)
+        return RationalArray(self.numerators * other.numerators,
+                             self.denominator * other.denominator)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _fraction(other)
+        if other == 0:
+            raise ZeroDivisionError('RationalArray: division by zero')
+        sign = -1 if other < 0 else 1
+        return RationalArray(sign * other.denominator * self.numerators,
+                             sign * self.denominator * other.numerator)
+
+    def __pow__(self, n):
+        # A negative power is a power of the reciprocals of the elements.
+        # The array is formed anew from them, with a positive common
+        # denominator.
+        if not isinstance(n, numbers.Integral):
+            raise TypeError('RationalArray: power not an integer')
+        if n >= 0:
+            return RationalArray(self.numerators**n, self.denominator**n)
+        if any(p == 0 for p in self.numerators):
+            raise ZeroDivisionError('RationalArray: division by zero')
+        q = self.denominator
+        return RationalArray([Fraction(q, p)**-n for p in self.numerators])
+
+    def __getitem__(self, key):
+        # Index the array. A single element is returned as a `Fraction`.
+        if isinstance(key, numbers.Integral):
+            return Fraction(self.numerators[key], self.denominator)
+        return RationalArray(self.numerators[key], self.denominator)
+
+    def __len__(self):
+        return len(self.numerators)
+
+    def __repr__(self):
+        return 'RationalArray({!r}, {})'.format(list(self.numerators),
+                                                 self.denominator)
+
+
+def _rational_array(a, n=None):
+    # Returns `a` as a `RationalArray`. A scalar is repeated `n` times.
+    if isinstance(a, RationalArray):
+        return a
+    if _is_scalar(a):
+        if n is None:
+            raise TypeError('RationalArray: scalar where array expected')
+        a = _fraction(a)
+        return RationalArray([a.numerator] * n, a.denominator)
+    a = np.asarray(a)
+    if a.dtype.kind == 'f':
+        return RationalArray.from_floats(a)
+    return RationalArray(a)
+
+
+def _is_scalar(a):
+    # Returns the result of a check that `a` is a scalar operand.
+    return isinstance(a, numbers.Number) or isinstance(a, str)
+
+
+def _fraction(a):
+    # Returns scalar `a` as a `Fraction`. A float is converted exactly.
+    if isinstance(a, numbers.Real) and not isinstance(a, numbers.Rational):
+        return to_fraction(a)
+    return exactly(a)
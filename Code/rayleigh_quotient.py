@@ -10,18 +10,81 @@ def rayleigh_quotient(W, v):
     
     The latter value is undefined if any element of `W @ v` is zero.
     """
-    # Calculate the vector dot product using the numerically stable
-    # `fsum` to sum the elements of the pointwise product of vectors.
-    def dot(u, v):
-        return math.fsum(u * v)
+    # Calculate the vector dot products using the numerically stable
+    # `compensated_dot`, which is as accurate as if the products and
+    # sums were calculated in twice the working precision.
     #
     # The Rayleigh quotient is (v.T @ W @ v) / (v.T @ v). 
-    Wv_product = np.array([dot(row, v) for row in W])
-    e_value = dot(v, Wv_product) / dot(v, v)
+    Wv_product = compensated_dot(W, v)
+    e_value = compensated_dot(v, Wv_product) / compensated_dot(v, v)
     #
     # Calculate the maximum absolute relative error, assuming that all
     # elements of `Wv_product` are nonzero. NumPy will issue a warning
     # if any of the elements are zero.
     relative_errors = (e_value * v - Wv_product) / Wv_product
     mare = np.max(np.abs(relative_errors))
-    return e_value, mare
\ No newline at end of file
+    return e_value, mare
+
+
+def compensated_dot(A, v, block_size=256):
+    """
+    Returns the dot products of the rows of `A` and vector `v`.
+    
+    If `A` is a vector, then its dot product with `v` is returned. The
+    result is as accurate as if calculated in twice the working
+    precision, and then rounded to working precision (algorithm Dot2 of
+    Ogita, Rump, and Oishi). The calculations are vectorized, with the
+    sums reduced pairwise. Rows of `A` are processed in blocks of
+    `block_size` to limit the sizes of temporary arrays.
+    """
+    # Each product and each sum is an error-free transformation: the
+    # rounded result plus an error term that is exactly representable.
+    # The error terms are small, and are summed in ordinary floating-
+    # point arithmetic.
+    A = np.asarray(A, dtype=float)
+    v = np.asarray(v, dtype=float)
+    if A.ndim == 1:
+        return _compensated_sum(*_two_product(A, v))
+    result = np.empty(A.shape[0])
+    for start in range(0, A.shape[0], block_size):
+        rows = slice(start, start + block_size)
+        result[rows] = _compensated_sum(*_two_product(A[rows], v))
+    return result
+
+
+def _compensated_sum(terms, errors):
+    # Returns sums over the last axis of `terms`, compensated for the
+    # rounding errors in pairwise summation, and corrected by `errors`.
+    correction = np.sum(errors, axis=-1)
+    while terms.shape[-1] > 1:
+        if terms.shape[-1] % 2 == 1:
+            pad = np.zeros(terms.shape[:-1] + (1,))
+            terms = np.concatenate((terms, pad), axis=-1)
+        terms, errors = _two_sum(terms[...,0::2], terms[...,1::2])
+        correction += np.sum(errors, axis=-1)
+    return terms[...,0] + correction
+
+
+def _two_sum(a, b):
+    # Returns s = fl(a + b) and the error a + b - s (Knuth).
+    s = a + b
+    z = s - a
+    return s, (a - (s - z)) + (b - z)
+
+
+def _split(a):
+    # Returns high and low parts of `a`, each with at most 26 significant
+    # bits, that sum exactly to `a` (Veltkamp).
+    c = 134217729.0 * a
+    high = c - (c - a)
+    return high, a - high
+
+
+def _two_product(a, b):
+    # Returns p = fl(a * b) and the error a * b - p (Dekker).
+    p = a * b
+    a_high, a_low = _split(a)
+    b_high, b_low = _split(b)
+    error = (a_low * b_low - (((p - a_high * b_high) - a_low * b_high)
+                              - a_high * b_low))
+    return p, error
@@ -1,4 +1,5 @@
-def reflection_mixture(ccdf, weight, n, delta, normed=False):
+def reflection_mixture(ccdf, weight, n, delta, normed=False,
+                       bin_masses=None):
     """
     Return discretized mixture of a distribution and its reflection.
     
@@ -10,6 +11,10 @@ def reflection_mixture(ccdf, weight, n, delta, normed=False):
                 spaced points, the (n+1)-st of which is zero
     * `delta` : spacing of points (exact)
     * `normed`: determines whether the masses are normalized
+    * `bin_masses`: optional function of an array of bin walls,
+                returning the mass below the first wall and the array
+                of masses between walls (see `gamma_bin_masses`), used
+                instead of differencing values of `ccdf`
     
     "Exact" parameter values are of type `str`, `int`, or `Fraction`.
     The values returned by function `ccdf` should be of type `Fraction`.
@@ -18,12 +23,15 @@ def reflection_mixture(ccdf, weight, n, delta, normed=False):
     # excludes the last element, and `a[::-1]` reverses the elements.
     delta, weight = exactly(delta, weight)
     bins = equispaced(n + 1, spacing=delta, start=delta/2)
-    ccdf_values = ccdf(bins)
-    mass_at_zero = 1 - ccdf_values[0]
-    unweighted_tail_masses = ccdf_values[:-1] - ccdf_values[1:]
+    if bin_masses is None:
+        ccdf_values = ccdf(bins)
+        mass_at_zero = 1 - ccdf_values[0]
+        unweighted_tail_masses = ccdf_values[:-1] - ccdf_values[1:]
+    else:
+        mass_at_zero, unweighted_tail_masses = bin_masses(bins)
     upper_tail = weight * unweighted_tail_masses
     lower_tail = (1 - weight) * unweighted_tail_masses[::-1]
     pmf = np.concatenate((lower_tail, [mass_at_zero], upper_tail))
     if normed:
-        pmf /= sum(pmf)
+        pmf /= fsum(pmf)
     return pmf
\ No newline at end of file
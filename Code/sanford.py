@@ -9,8 +9,33 @@ class Sanford(object):
     For an instance `d` of this class, the value of `d[k + d.K - 1]` is
     the probability of effect k w in D_K. Probabilities are of type
     `Fraction`, though they are calculated inexactly.
+    
+    The DFE is extended to multiple loci by setting the genomic mutation
+    rate `U` and the number L of loci. Then indexing gives
+    the distribution of the sum of effects at L loci, each mutating
+    with probability U / L. The single-locus DFE is member `dfe`. In the
+    limit of infinitely many loci, the number of mutations is Poisson-
+    distributed with mean U.
+
+    Single-locus DFEs, and the Gamma masses from which they are derived,
+    are kept in the cache that is class member `cache` (see `LRUCache`).
+    Thus the masses are calculated once for all DFEs that differ only in
+    `gamma`, and each DFE is calculated once for all values of `U` and
+    L. To keep the cached values on disk, e.g., for later sessions, set
+    `Sanford.cache = LRUCache(directory=path)`.
+
+    The multi-locus distributions are calculated slowly for large L. To
+    keep them on disk, set class member `q_cache` to an `ArrayCache`.
+    Increment class member `version` when changing the calculations, so
+    that distributions calculated by the old code are not used.
     """
-    def __init__(self, K, w='5e-4', gamma='1e-3', beta='500', normed=True):
+    cache = LRUCache()
+    q_cache = None
+    version = 1
+
+    def __init__(self, K, w='5e-4', gamma='1e-3', beta='500', normed=True,
+                       U='1', log_L=0, L=None, convolution='direct',
+                       multiprecision=False):
         """
         Calculates probabilities for the discrete form of Sanford's DFE.
 
@@ -20,16 +45,95 @@ class Sanford(object):
         * `gamma` : weighting of positive effects (exact)
         * `beta`  : rate parameter (exact)
         * `normed`: determines whether the masses are normalized
+        * `U`     : genomic mutation rate (exact)
+        * `log_L` : base-2 logarithm (an integer) of the number of loci
+        * `L`     : number of loci (a positive integer, or `np.inf`
+                    for the limit of infinitely many loci), overriding
+                    `log_L` if given
+        * `convolution`: method of the L-fold convolution, 'direct' or
+                    'fft' (see `convolution_power` and
+                    `compound_poisson`)
+        * `multiprecision`: determines whether the DFE is calculated
+                    entirely in multiprecision arithmetic, rather than
+                    in floating-point (see `gamma_bin_masses`)
         
         "Exact" supplied values are of type `str`, `int`, or `Fraction`.
         """
         # Validate "exact" parameters and convert them to `Fraction`.
-        self.gamma, self.w, self.beta = all_exact([gamma, w, beta])
+        self.gamma, self.w, self.beta, self.U = exactly(gamma, w, beta, U)
         self.K = K
-        self.dfe = reflection_mixture(self.gamma_ccdf, gamma, K, w)
+        if L is None:
+            L = 2**log_L
+        else:
+            log_L = math.log2(L)
+        self.L, self.log_L = L, log_L
+        self.dfe = self.single_locus_dfe(K, w, gamma, beta, normed,
+                                         multiprecision)
+        #
+        # A locus mutates with probability U / L. The distribution of
+        # effects at a single locus is the DFE, weighted by U / L, plus
+        # the probability 1 - U / L of no mutation at zero effect.
+        # In the limit of infinitely many loci, the distribution is the
+        # compound Poisson distribution of the DFE (see `_convolve`).
+        if L == np.inf:
+            self.q = self.dfe.copy()
+        else:
+            self.q = (self.U / self.L) * self.dfe
+            self.q[self.K] += 1 - self.U / self.L
+        key = ('q', self.version, K, self.w, self.gamma, self.beta, self.U,
+               L, normed, multiprecision, convolution, mp.prec)
+        self._convolve(L, convolution, key)
         if normed:
-            self.dfe /= sum(self.dfe)
-            
+            self.q /= fsum(self.q)
+
+    def _convolve(self, L, method='direct', key=None):
+        # Calculate the L-fold convolution of `q` in floating-point, or
+        # the compound Poisson distribution of `q` if L is infinite. The
+        # result is cached if there is a cache, with the given `key`.
+        if L > 1:
+            def calculate():
+                q = self.q.astype(float)
+                if L == np.inf:
+                    return compound_poisson(q, float(self.U), method)
+                return convolution_power(q, L, method)
+            if self.q_cache is None:
+                q = calculate()
+            else:
+                q = self.q_cache.get(key, calculate)
+            self.q = to_fraction(q)
+
+    @classmethod
+    def single_locus_dfe(cls, K, w='5e-4', gamma='1e-3', beta='500',
+                              normed=True, multiprecision=False):
+        """
+        Returns the single-locus DFE, calculating it only if not cached.
+
+        Parameters are as for initialization. The returned array is a
+        copy of the cached array.
+        """
+        gamma, w, beta = exactly(gamma, w, beta)
+        key = ('dfe', K, w, gamma, beta, normed, multiprecision, mp.prec)
+        def calculate():
+            dfe = reflection_mixture(None, gamma, K, w, bin_masses=masses)
+            if normed:
+                dfe /= fsum(dfe)
+            return dfe
+        def masses(bins):
+            key = ('bin masses', K, w, beta, multiprecision, mp.prec)
+            return cls.cache.get(key, lambda: cls._bin_masses(beta, bins,
+                                                              multiprecision))
+        return cls.cache.get(key, calculate).copy()
+
+    @staticmethod
+    def _bin_masses(beta, x, multiprecision):
+        # Return the Gamma CDF at `x[0]`, and the masses between points
+        # in `x`, as `Fraction` objects. Subclasses may override this to
+        # calculate the masses differently.
+        if not multiprecision:
+            return gamma_bin_masses(beta, x)
+        ccdf_values = to_fraction(mp_erfc(mp_sqrt(to_mpf(beta * x))))
+        return 1 - ccdf_values[0], ccdf_values[:-1] - ccdf_values[1:]
+
     def gamma_ccdf(self, x):
         """
         Return values of the Gamma complementary CDF at points in `x`.
@@ -42,9 +146,9 @@ class Sanford(object):
         return to_fraction(mp_erfc(mp_sqrt(z)))
             
     def __getitem__(self, key):
-        # Index the array representing the DFE.
-        return self.dfe[key]
+        # Index the array representing the (multi-locus) distribution.
+        return self.q[key]
     
     def __len__(self):
-        # Return the length of the array representing the DFE.
-        return len(self.dfe)
\ No newline at end of file
+        # Return the length of the array representing the distribution.
+        return len(self.q)
\ No newline at end of file
@@ -1,3 +1,6 @@
+import json
+import os
+
 class Solver(object):
     """
     A solver for relative frequencies in the modified model.
@@ -12,8 +15,27 @@ class Solver(object):
     
     The solver is run by calling this object. Each call extends the 
     solutions by a given number of years. The end-of-year solutions are
-    retrieved by indexing this object.
+    retrieved by indexing this object. Storage for solutions grows
+    geometrically, so repeated calls for a few years at a time do not
+    repeatedly copy the stored solutions. Call `map_storage` to keep the
+    stored solutions in a memory-mapped file, rather than in memory, or
+    call `summarize` to store only summary statistics of the solutions
+    for most years. Call `save` to checkpoint the solver, and `restore`
+    to resume.
+
+    The derivative operator `W` is not modified. Instead, Boolean array
+    `zeroed` indicates which frequencies are held at zero, and steps of
+    integration involve only the rows and columns of `W` for the other
+    classes. The restriction of `W` to those rows and columns is formed
+    anew only when additional frequencies fall below threshold.
     """ 
+    # The latest solution, retained regardless of storage.
+    _latest = None
+    #
+    # Members that are not saved by the `save` method. They are derived
+    # from the derivative operator when the solver is restored.
+    _unsaved = {'W', '_W', '_rows', '_cols', '_storage', 'storage_path'}
+
     def __init__(self, W, initial_freqs, log_steps_per_year=10,
                        threshold=1e-9):
         """
@@ -29,7 +51,7 @@ class Solver(object):
         less than `threshold` times the sum of the initial frequencies
         set to zero.
         """
-        self.W = np.array(W)
+        self.W = self._operator(W)
         assert type(log_steps_per_year) is int
         assert log_steps_per_year >= 0
         self.steps_per_year = 2 ** log_steps_per_year
@@ -47,15 +69,32 @@ class Solver(object):
         self.max_exponent = 510 - math.ceil(math.log2(len(self.s)))
         self.s_bias = bias_exponents(self.s, self.max_exponent)
         #
+        # Each integration step adds derivatives to the elements of `s`
+        # indexed by `_rows`. The derivatives are the product of the
+        # operator `_W` and the elements of `s` indexed by `_cols`.
+        # Initially, all rows and columns of `W` are involved.
+        self.zeroed = np.zeros(len(self.s), dtype=bool)
+        self._rows = self._cols = slice(None)
+        self._W = self.W
+        #
         # Zero initial frequencies that are below threshold.
         self._zero()
         #
-        # Array `solutions` contains the solutions for end-of-year
-        # relative frequencies of classes. The base type is float. There
-        # is one row for each year.
-        self.n_solutions = 1
-        self.solutions = np.empty((self.n_solutions, len(self.s)))
-        self.solutions[0] = self.s / fsum(self.s)
+        # Array `_storage` contains the solutions for end-of-year
+        # relative frequencies of classes in its first `n_solutions`
+        # rows, one row for each year. The base type is float. Member
+        # `year` is the year of the latest solution.
+        self.storage_path = None
+        self.stop_year = None
+        self.summary_x = None
+        self.year = 0
+        self.n_solutions = 0
+        self._storage = np.empty((1, len(self.s)))
+        self._store(self.s / fsum(self.s))
+
+    def _operator(self, W):
+        # Returns the derivative operator applied in integration steps.
+        return np.array(W)
 
     def _zero_subthreshold_frequencies(self):
         """
@@ -76,41 +115,266 @@ class Solver(object):
         Zeroes subthreshold calculated frequencies and their derivatives.
         """
         if self.threshold > 0.0:
-            # Array `zeroed` indicates which calculated frequencies are
-            # zero. Rows of the derivative operator `W` corresponding to
-            # zeroed frequencies are zeroed.
-            zeroed = self._zero_subthreshold_frequencies()
-            self.W[zeroed,:] = 0.0
+            # Array `subthreshold` indicates which calculated frequencies
+            # are zero. Restrict the derivative operator only if some of
+            # them were not zeroed previously.
+            subthreshold = self._zero_subthreshold_frequencies()
+            if np.any(subthreshold & ~self.zeroed):
+                self.zeroed |= subthreshold
+                self._restrict()
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator to classes not zeroed.
+        """
+        # Zeroed frequencies and their derivatives are held at zero. So
+        # the rows and the columns of `W` for zeroed classes are omitted
+        # from the product of `W` and `s`.
+        live = np.flatnonzero(~self.zeroed)
+        self._rows = self._cols = live
+        self._W = self.W[np.ix_(live, live)]
         
-    def __call__(self, n_years=1000):
+    def __call__(self, n_years=1000, tolerance=None, criterion='change'):
         """
         Solve for `n_years` end-of-year relative frequencies.
+
+        If `tolerance` is given, then the solver stops early when the
+        solution has converged, as determined at the end of each year
+        by the given `criterion`:
+        * 'change': the maximum absolute change in relative frequencies
+                    over the year is no greater than `tolerance`
+        * 'growth': the absolute change in the growth rate (the Rayleigh
+                    quotient of the derivative operator and the relative
+                    frequencies) over the year, relative to the growth
+                    rate, is no greater than `tolerance`
+        The year in which the solver stopped early is assigned to member
+        `stop_year`, and storage for the remaining years is released.
         """
+        assert criterion in ('change', 'growth')
+        self.stop_year = None
+        if tolerance is not None and criterion == 'growth':
+            self._growth_rate = self._rayleigh_quotient()
+        #
         # Extend the `solutions` array to hold an additional `n_years`
         # solutions for end-of-year relative frequencies.
-        self._extend_storage(n_years)
+        self._extend_storage(self._n_stored(n_years))
         #
         for _ in range(n_years):
             # Perform `steps_per_year` numerical integration steps.
-            for _ in range(self.steps_per_year):
-                # Multiply derivative operator `W` by the calculated
-                # frequencies `s` to obtain derivatives of frequencies.
-                # Scale the derivatives by the step size, and add the
-                # result to `s`.
-                self.s += self.step_size * (self.W @ self.s)
-                #
-                # Zero subthreshold elements of `s`. Derivatives of
-                # zeroed frequencies are set to zero unless the `_zero`
-                # method is overridden.
-                self._zero()
-            # Bias exponents of the current solution to avoid overflow
-            # and underflow. Keep track of the cumulative bias.
-            self.s_bias += bias_exponents(self.s, self.max_exponent)
-            #
-            # Store the solution for end-of-year relative frequencies.
-            self.solutions[self.n_solutions] = self.s / fsum(self.s)
+            self._year()
+            self._end_year()
+            if tolerance is not None:
+                if self._converged(tolerance, criterion):
+                    self.stop_year = self.year
+                    self._trim_storage()
+                    break
+
+    def _converged(self, tolerance, criterion):
+        """
+        Returns an indication of whether the solution has converged.
+        """
+        if criterion == 'change':
+            change = np.abs(self._latest - self._previous)
+            return np.max(change) <= tolerance
+        growth_rate = self._rayleigh_quotient()
+        drift = np.abs(growth_rate - self._growth_rate) / np.abs(growth_rate)
+        self._growth_rate = growth_rate
+        return np.max(drift) <= tolerance
+
+    def _rayleigh_quotient(self):
+        """
+        Returns the Rayleigh quotient for the latest relative frequencies.
+        """
+        # Only the rows and columns of the derivative operator involved in
+        # integration steps are involved in the product with `v`.
+        v = self._latest
+        Wv = self._W @ v[self._cols]
+        return fsum(v[self._rows] * Wv) / fsum(v * v)
+
+    def _end_year(self):
+        """
+        Biases exponents of the solution, and stores the solution.
+        """
+        # Bias exponents of the current solution to avoid overflow and
+        # underflow. Keep track of the cumulative bias.
+        self.s_bias += bias_exponents(self.s, self.max_exponent)
+        #
+        # Store the solution for end-of-year relative frequencies.
+        self.year += 1
+        self._store(self.s / fsum(self.s))
+
+    def _store(self, v):
+        """
+        Stores the solution `v` for the latest year, or its summary.
+        """
+        # The latest two solutions are retained in any case.
+        self._previous, self._latest = self._latest, v
+        if self.summary_x is not None:
+            mean, variance = mean_and_variance(self.summary_x, v)
+            nonzero = v > 0.0
+            first = np.argmax(nonzero, axis=-1)
+            last = nonzero.shape[-1] - np.argmax(nonzero[...,::-1], axis=-1)
+            self.means.append(mean)
+            self.variances.append(variance)
+            self.support_widths.append(last - first)
+        if self._is_stored(self.year):
+            self._storage[self.n_solutions] = v
             self.n_solutions += 1
 
+    def summarize(self, x, years=(), stride=None):
+        """
+        Stores summary statistics, and only some solutions, for each year.
+
+        For each subsequent year, the mean and variance of `x` (e.g., the
+        fitnesses of classes) with respect to the solution are appended
+        to the lists `means` and `variances`, and the number of classes
+        from the first to the last nonzero frequency is appended to the
+        list `support_widths`. Solutions are stored only for the given
+        `years`, and for years that are multiples of `stride` (if given).
+        The solution for year 0 is stored in any case. The years of the
+        stored solutions are given by `stored_years`.
+
+        The method must be called before the solver is run.
+        """
+        assert self.year == 0
+        self.summary_x = np.array(x, dtype=float)
+        self.summary_years = set(years)
+        self.summary_stride = stride
+        self.means, self.variances, self.support_widths = [], [], []
+        self._previous = self._latest = None
+        self.n_solutions = 0
+        self._store(self._storage[0].copy())
+
+    def save(self, path, **params):
+        """
+        Saves the state of the solver in directory `path`.
+
+        The derivative operator is not saved. Instead, keyword arguments
+        `params` (e.g., the parameters of the distribution of mutational
+        effects, the number of classes, and the death rate) are saved,
+        and are retrieved by `saved_params`. Arrays are saved in NumPy
+        binary format, and the stored solutions are saved in the file
+        'solutions.dat' in the format described for `map_storage`. Other
+        state is saved in the JSON file 'state.json'.
+        """
+        # Only the rows of storage containing solutions are saved. If
+        # storage is already mapped to the file, it is simply flushed.
+        os.makedirs(path, exist_ok=True)
+        solutions_path = os.path.join(path, 'solutions.dat')
+        if self.storage_path == solutions_path:
+            self._storage.flush()
+        else:
+            shape = self.solutions.shape
+            file = np.memmap(solutions_path, dtype=float, mode='w+',
+                             shape=shape)
+            file[:] = self.solutions
+            file.flush()
+        state = {'params': params, 'arrays': [], 'lists': [],
+                 'storage_shape': self._storage.shape[1:]}
+        for name, value in vars(self).items():
+            if name in self._unsaved:
+                continue
+            if isinstance(value, np.ndarray):
+                np.save(os.path.join(path, name + '.npy'), value)
+                state['arrays'].append(name)
+            elif isinstance(value, list):
+                np.save(os.path.join(path, name + '.npy'), np.array(value))
+                state['lists'].append(name)
+            elif isinstance(value, set):
+                state[name] = sorted(value)
+            else:
+                state[name] = value
+        with open(os.path.join(path, 'state.json'), 'w') as file:
+            json.dump(state, file, default=lambda x: x.item())
+
+    @staticmethod
+    def saved_params(path):
+        """
+        Returns the parameters saved with a solver in directory `path`.
+        """
+        with open(os.path.join(path, 'state.json')) as file:
+            return json.load(file)['params']
+
+    @classmethod
+    def restore(cls, path, W):
+        """
+        Restores a solver saved in directory `path`.
+
+        The derivative operator `W` must be the one with which the solver
+        was created (constructed from the parameters given by the method
+        `saved_params`). The saved solutions are memory-mapped, not read,
+        and solutions for subsequent years are added to the file.
+        """
+        with open(os.path.join(path, 'state.json')) as file:
+            state = json.load(file)
+        self = cls.__new__(cls)
+        for name in state.pop('arrays'):
+            setattr(self, name, np.load(os.path.join(path, name + '.npy')))
+        for name in state.pop('lists'):
+            value = np.load(os.path.join(path, name + '.npy'))
+            setattr(self, name, list(value))
+        shape = (state['n_solutions'],) + tuple(state.pop('storage_shape'))
+        del state['params']
+        for name, value in state.items():
+            setattr(self, name, value)
+        if 'summary_years' in state:
+            self.summary_years = set(self.summary_years)
+        #
+        # Form the operator for the integration steps, and map storage.
+        self.W = self._operator(W)
+        self._rows = self._cols = slice(None)
+        self._W = self.W
+        if np.any(self.zeroed):
+            self._restrict()
+        self.storage_path = os.path.join(path, 'solutions.dat')
+        self._storage = np.memmap(self.storage_path, dtype=float,
+                                  mode='r+', shape=shape)
+        return self
+
+    def _is_stored(self, year):
+        # Indicates whether the solution for `year` is stored.
+        if self.summary_x is None or year == 0:
+            return True
+        if year in self.summary_years:
+            return True
+        return self.summary_stride is not None \
+               and year % self.summary_stride == 0
+
+    def _n_stored(self, n_years):
+        # Returns the number of solutions stored for the next `n_years`.
+        if self.summary_x is None:
+            return n_years
+        years = range(self.year + 1, self.year + n_years + 1)
+        return sum(self._is_stored(year) for year in years)
+
+    @property
+    def stored_years(self):
+        # Returns the years of the stored solutions.
+        years = range(self.year + 1)
+        return [year for year in years if self._is_stored(year)]
+
+    def _year(self):
+        """
+        Performs the numerical integration steps of one year.
+        """
+        for _ in range(self.steps_per_year):
+            self._step()
+
+    def _step(self):
+        """
+        Performs one numerical integration step.
+        """
+        # Multiply the (restricted) derivative operator by the calculated
+        # frequencies to obtain derivatives of frequencies. Scale the
+        # derivatives by the step size, and add the result to `s`.
+        s = self.s[self._cols]
+        self.s[self._rows] += self.step_size * (self._W @ s)
+        #
+        # Zero subthreshold elements of `s`. Derivatives of zeroed
+        # frequencies are held at zero unless the `_zero` method is
+        # overridden.
+        self._zero()
+
     def get_last_solution(self):
         """
         Returns unnormalized solution for frequencies in the last year.
@@ -127,12 +391,59 @@ class Solver(object):
         # Returns the number of stored solutions (one per year).
         return len(self.solutions)
 
+    @property
+    def solutions(self):
+        # Returns the stored solutions, a view of the storage.
+        return self._storage[:self.n_solutions]
+
     def _extend_storage(self, n):
-        # Allocate storage for solutions for an additional `n` years.
-        rows, cols = self.solutions.shape
-        new = np.zeros((rows+n, cols), dtype=float)
-        new[:rows] = self.solutions
-        self.solutions = new
+        # Ensure that there is storage for solutions for an additional
+        # `n` years. When storage is reallocated, its capacity is at
+        # least doubled, so the cost of copying is amortized.
+        capacity = len(self._storage)
+        if self.n_solutions + n <= capacity:
+            return
+        shape = (max(self.n_solutions + n, 2 * capacity),)
+        shape += self._storage.shape[1:]
+        if self.storage_path is None:
+            new = np.empty(shape)
+            new[:self.n_solutions] = self.solutions
+            self._storage = new
+        else:
+            # Lengthen the file, and map the lengthened file. The stored
+            # solutions are not copied.
+            self._storage.flush()
+            with open(self.storage_path, 'r+b') as file:
+                file.truncate(np.prod(shape) * self._storage.itemsize)
+            self._storage = np.memmap(self.storage_path, dtype=float,
+                                      mode='r+', shape=shape)
+
+    def _trim_storage(self):
+        # Release storage in excess of that for the stored solutions.
+        shape = (self.n_solutions,) + self._storage.shape[1:]
+        if self.storage_path is None:
+            self._storage = self.solutions.copy()
+        else:
+            self._storage.flush()
+            with open(self.storage_path, 'r+b') as file:
+                file.truncate(np.prod(shape) * self._storage.itemsize)
+            self._storage = np.memmap(self.storage_path, dtype=float,
+                                      mode='r+', shape=shape)
+
+    def map_storage(self, path):
+        """
+        Keeps stored solutions in a memory-mapped file at `path`.
+
+        Solutions stored previously are copied to the file, which is
+        created (or overwritten). The file contains the solutions as
+        64-bit floats in native byte order, one year after another, and
+        possibly some unused space at the end.
+        """
+        shape = self._storage.shape
+        storage = np.memmap(path, dtype=float, mode='w+', shape=shape)
+        storage[:self.n_solutions] = self.solutions
+        self._storage = storage
+        self.storage_path = path
 
         
 class PoorSolver(Solver):
@@ -146,4 +457,315 @@ class PoorSolver(Solver):
         Derivatives of zeroed frequencies are NOT set to zero.
         """
         if self.threshold > 0.0:
-            self._zero_subthreshold_frequencies()
\ No newline at end of file
+            subthreshold = self._zero_subthreshold_frequencies()
+            if np.any(subthreshold != self.zeroed):
+                self.zeroed = subthreshold
+                self._restrict()
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator to columns for nonzero classes.
+        """
+        # Zeroed frequencies contribute nothing to the derivatives of
+        # frequencies. Thus the columns of `W` for zeroed classes are
+        # omitted from the product of `W` and `s`, but all of the rows
+        # are retained.
+        self._rows = slice(None)
+        self._cols = np.flatnonzero(~self.zeroed)
+        self._W = self.W[:,self._cols]
+
+
+class ConvolutionSolver(Solver):
+    """
+    A solver that applies the derivative operator by FFT convolution.
+
+    Solutions are those of `Solver`, to within floating-point tolerance,
+    but each integration step requires O(n log n) operations, rather
+    than O(n**2), for n classes. See `ConvolutionOperator`. Elements of
+    the convolution that the FFT calculates inaccurately, i.e., those
+    many orders of magnitude smaller than the largest, are calculated
+    anew. Thus threshold zero yields the infinite-population model, as
+    for `Solver`. With threshold zero, a step is cheaper than the dense
+    product when there are many classes, e.g., 12 ms rather than 15 ms
+    for 5001 classes, but not when there are few. With a positive
+    threshold, `BandedSolver` is faster, e.g., 1.0 ms rather than 1.25 ms
+    per step for 5001 classes.
+    """
+    def __init__(self, W, initial_freqs, log_steps_per_year=10,
+                       threshold=1e-9, d=0.0):
+        """
+        Initialize the solver.
+
+        Parameter `W` is an instance of `Derivative` (not a matrix), and
+        `d` is the death-rate parameter. Other parameters are as for
+        `Solver`.
+        """
+        self.d = d
+        super().__init__(W, initial_freqs, log_steps_per_year, threshold)
+
+    def _operator(self, W):
+        # Returns the convolution form of derivative operator `W`.
+        return ConvolutionOperator(W, self.d)
+
+    def _restrict(self):
+        """
+        Zeroes the rows of the operator for zeroed classes.
+        """
+        # The full convolution is calculated in every step, and the
+        # derivatives of zeroed frequencies are then zeroed.
+        self.W.zero_rows(self.zeroed)
+
+
+class BandedSolver(Solver):
+    """
+    A solver that steps only the band of classes that remain live.
+
+    Zeroed frequencies are held at zero, and make no contribution to
+    the derivatives of other frequencies. Thus each integration step
+    need involve only the rows and columns of `W` in the band from the
+    first to the last nonzero frequency. The band narrows as classes are
+    zeroed, and the cost of a step scales with the square of the width
+    of the band, rather than with n**2. Slices of the band are views,
+    and the subthreshold test is confined to the band. The solutions
+    agree with those of `Solver` to within rounding error.
+
+    With threshold zero, no frequencies are held at zero, and the band
+    comprises all classes.
+    """
+    def __init__(self, W, initial_freqs, log_steps_per_year=10,
+                       threshold=1e-9):
+        """
+        Initialize the solver. Parameters are as for `Solver`.
+        """
+        # The band of live classes is `lo`, ..., `hi` - 1. It initially
+        # comprises all classes, and is narrowed by the `_zero` method.
+        self.lo, self.hi = 0, len(initial_freqs)
+        super().__init__(W, initial_freqs, log_steps_per_year, threshold)
+
+    def _zero(self):
+        """
+        Zeroes subthreshold frequencies and derivatives, narrowing band.
+        """
+        if self.threshold > 0.0:
+            # Frequencies outside the band are zero, so the sum of
+            # frequencies within the band is the sum of all frequencies.
+            band = slice(self.lo, self.hi)
+            s = self.s[band]
+            subthreshold = s < self.threshold * s.sum()
+            s[subthreshold] = 0.0
+            if np.any(subthreshold & ~self.zeroed[band]):
+                self.zeroed[band] |= subthreshold
+                self._restrict()
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator to the band of live classes.
+        """
+        # Narrow the band to the first through the last classes not
+        # zeroed. Slices of `s` are views, so `s` is updated in place.
+        # Rows for zeroed classes within the band are zeroed in a copy
+        # of the band of `W`. If all classes are zeroed, then the band is
+        # empty.
+        live = np.flatnonzero(~self.zeroed)
+        if len(live) == 0:
+            self.lo = self.hi = 0
+        else:
+            self.lo, self.hi = live[0], live[-1] + 1
+        band = slice(self.lo, self.hi)
+        self._rows = self._cols = band
+        self._W = self.W[band,band].copy()
+        self._W[self.zeroed[band],:] = 0.0
+
+
+class PropagatorSolver(Solver):
+    """
+    A solver that advances a year at a time by a propagator matrix.
+
+    One year of forward Euler steps, without zeroing of frequencies, is
+    multiplication by the propagator P = (I + hW)**steps_per_year, where
+    h is the step size. The propagator is calculated by repeated squaring
+    of I + hW, with `log_steps_per_year` matrix products, and each year
+    then requires a single matrix-vector product. The solutions agree
+    with those of `Solver` to within rounding error.
+
+    With a positive threshold, the propagator is formed from the rows
+    and columns of `W` for classes not zeroed. If frequencies fall below
+    threshold at the end of a year, the year is instead solved step by
+    step, as by `Solver`, and the propagator is formed anew for the
+    following year. A frequency that falls below threshold during a
+    year, but not at the end, is not zeroed.
+
+    Forming the propagator requires O(n**3) operations. It is worthwhile
+    for long runs in which few classes are zeroed.
+    """
+    # The propagator is formed when first needed, and is not saved.
+    _P = None
+    _unsaved = Solver._unsaved | {'_P'}
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator, and discards the propagator.
+        """
+        super()._restrict()
+        self._P = None
+
+    def _propagator(self):
+        """
+        Returns the propagator for the restricted derivative operator.
+        """
+        # Square I + hW once for each doubling of the number of steps.
+        P = self.step_size * self._W
+        P[np.diag_indices(len(P))] += 1.0
+        for _ in range(self.steps_per_year.bit_length() - 1):
+            P = P @ P
+        return P
+
+    def _year(self):
+        """
+        Advances the solution by one year, using the propagator.
+        """
+        if self._P is None:
+            self._P = self._propagator()
+        s = self._P @ self.s[self._cols]
+        #
+        # Accept the solution if no frequency of a class not yet zeroed
+        # is below threshold. Otherwise solve step by step.
+        if self.threshold > 0.0:
+            if np.any(s < self.threshold * s.sum()):
+                super()._year()
+                return
+        self.s[self._rows] = s
+
+
+class BatchSolver(Solver):
+    """
+    A solver for a batch of initial frequencies and thresholds.
+
+    The columns of an n-by-B array of frequencies are solved together,
+    as by B instances of `Solver` with the same derivative operator `W`.
+    Each integration step is a single product of `W` with the n-by-B
+    array, rather than B matrix-vector products. Each column has its
+    own threshold, its own zeroed frequencies, and its own bias of
+    exponents. The solutions agree with those of `Solver`, column by
+    column, to within rounding error. Steps involve the rows and columns
+    of `W` for classes not zeroed in some column, so batching is most
+    efficient when the columns have similar supports.
+
+    Indexing the instance by year gives a B-by-n array, with one row of
+    end-of-year relative frequencies for each column. The solutions for
+    column `j` are obtained by indexing with `[:,j]`.
+    """
+    def __init__(self, W, initial_freqs, log_steps_per_year=10,
+                       threshold=1e-9):
+        """
+        Initialize the solver.
+
+        The columns of the n-by-B array `initial_freqs` are the initial
+        frequencies of classes. Parameter `threshold` is either a single
+        threshold for all columns or a sequence of B thresholds. Other
+        parameters are as for `Solver`.
+        """
+        self.W = self._operator(W)
+        assert type(log_steps_per_year) is int
+        assert log_steps_per_year >= 0
+        self.steps_per_year = 2 ** log_steps_per_year
+        self.step_size = 1 / self.steps_per_year
+        #
+        # Array `s` contains the latest solutions in its columns, each
+        # scaled by `2**s_bias[j]` for its column `j`.
+        self.s = np.array(initial_freqs, dtype=float)
+        n, B = self.s.shape
+        self.threshold = np.broadcast_to(threshold, B).astype(float)
+        self.max_exponent = 510 - math.ceil(math.log2(n))
+        self.s_bias = np.zeros(B, dtype=int)
+        self._bias_exponents()
+        #
+        # Boolean array `zeroed` indicates which frequencies are held at
+        # zero in each of the columns. Integration steps involve only the
+        # rows and columns of `W` for classes not zeroed in some column.
+        self.zeroed = np.zeros((n, B), dtype=bool)
+        self._rows = self._cols = slice(None)
+        self._W = self.W
+        self._zero()
+        #
+        # Array `_storage` contains one B-by-n array for each year.
+        self.storage_path = None
+        self.stop_year = None
+        self.summary_x = None
+        self.year = 0
+        self.n_solutions = 0
+        self._storage = np.empty((1, B, n))
+        self._store(self._relative_frequencies())
+
+    def _zero(self):
+        """
+        Zeroes subthreshold frequencies and their derivatives by column.
+        """
+        # Frequencies are zeroed only in columns with positive threshold.
+        # Restrict the derivative operator only if some class is zeroed
+        # in all of the columns for the first time.
+        thresholded = self.threshold > 0.0
+        if np.any(thresholded):
+            subthreshold = self.s < self.threshold * self.s.sum(axis=0)
+            subthreshold &= thresholded
+            self.s[subthreshold] = 0.0
+            self.zeroed |= subthreshold
+            if np.any(np.all(self.zeroed[self._rows], axis=1)):
+                self._restrict()
+
+    def _restrict(self):
+        """
+        Restricts the derivative operator to classes live in any column.
+        """
+        live = np.flatnonzero(~np.all(self.zeroed, axis=1))
+        self._rows = self._cols = live
+        self._W = self.W[np.ix_(live, live)]
+
+    def _step(self):
+        """
+        Performs one numerical integration step for all columns.
+        """
+        # Derivatives of zeroed frequencies are zeroed column by column.
+        derivatives = self._W @ self.s[self._cols]
+        derivatives[self.zeroed[self._rows]] = 0.0
+        self.s[self._rows] += self.step_size * derivatives
+        self._zero()
+
+    def _end_year(self):
+        """
+        Biases exponents of the solutions, and stores the solutions.
+        """
+        self._bias_exponents()
+        self.year += 1
+        self._store(self._relative_frequencies())
+
+    def _rayleigh_quotient(self):
+        """
+        Returns Rayleigh quotients for the latest relative frequencies.
+        """
+        # There is one Rayleigh quotient for each column.
+        v = self._latest.T
+        Wv = self._W @ v[self._cols]
+        Wv[self.zeroed[self._rows]] = 0.0
+        return np.sum(v[self._rows] * Wv, axis=0) / np.sum(v * v, axis=0)
+
+    def _bias_exponents(self):
+        # Bias exponents of each column to avoid overflow and underflow.
+        # Keep track of the cumulative bias of each column.
+        for j in range(len(self.s_bias)):
+            self.s_bias[j] += bias_exponents(self.s[:,j], self.max_exponent)
+
+    def _relative_frequencies(self):
+        # Returns relative frequencies, one row for each column of `s`.
+        sums = [fsum(column) for column in self.s.T]
+        return self.s.T / np.array(sums)[:,None]
+
+    def get_last_solution(self):
+        """
+        Returns unnormalized solutions for frequencies in the last year.
+
+        The elements of the returned n-by-B array are multiprecision
+        floats.
+        """
+        scales = np.array([mp.mpf(2.0)**-int(b) for b in self.s_bias])
+        return scales * self.s
\ No newline at end of file
@@ -57,43 +57,27 @@ def to_fraction(a):
         a = int(a)
     a, shape = raveled(a)
     #
-    # First try passing objects in `a` to the `Fraction` constructor.
-    # This will fail if `a` contains a multiprecision float.
-    try:
-        a = [Fraction(x) for x in a]
-        return shaped(a, shape)
-    except TypeError:
-        pass
-    #
-    # Fall back to treating elements of `a` as multiprecision floats.
-    # Represent `a` as `c * 2**power`, where all elements of `power` are 
-    # integers and all elements of `c` are multiprecision floats in the
-    # interval [0.5, 1).
-    c, power = mp_frexp(a)
-    numerator_power = max(mp.prec, np.max(power))
-    denominator_power = numerator_power - power
-    #
-    #       c * 2**power 
-    #    == c / 2**-power
-    #    == c * 2**numerator_power / 2**(numerator_power-power)
-    #    == c * 2**numerator_power / 2**denominator_power
-    #
-    # Elements of `c` are calculated with the current working precision,
-    # `mp.prec`, so scaling `c` by 
-    #
-    #     2**numerator_power >= 2**mp.prec
-    #
-    # yields an array of integers.
-    numerators = [int(p) for p in mp_ldexp(c, numerator_power)]
-    #
-    # Array `2**denom_power` contains only integers because `denom_power`
-    # contains only non-negative integers.
-    denominators = 2**denominator_power
-    #
-    # Construct Fractions from corresponding numerators and denominators.
-    a = [Fraction(p, q) for p, q in zip(numerators, denominators)]
+    # The `Fraction` constructor converts floats exactly, by way of their
+    # integer ratios, but does not accept multiprecision floats. These
+    # are converted instead from their mantissas and exponents, with no
+    # multiprecision arithmetic.
+    a = [_mpf_to_fraction(x) if isinstance(x, mp.mpf) else Fraction(x)
+             for x in a]
     return shaped(a, shape)
 
+def _mpf_to_fraction(x):
+    # Returns multiprecision float `x` as a `Fraction`. The value of `x`
+    # is (-1)**sign * man * 2**exp. A special value (infinity or NaN)
+    # has zero mantissa and nonzero exponent.
+    sign, man, exp, _ = x._mpf_
+    if man == 0 and exp != 0:
+        raise ValueError('to_fraction: {} is not finite'.format(x))
+    if sign:
+        man = -man
+    if exp >= 0:
+        return Fraction(man << exp)
+    return Fraction(man, 1 << -exp)
+
 
 #def is_rational(x):
 #    """
@@ -139,11 +123,16 @@ def fsum(a):
     """
     Returns an accurate sum of elements of `a`.
     
-    - `sum` is applied if the first element is rational
+    - `RationalArray.sum` is applied if the first element is a `Fraction`,
+      and `rational_array.py` has been run
+    - `sum` is applied if the first element is otherwise rational
     - `mpmath.fsum` is applied if the first element is multiprecision
     - `math.fsum` is applied otherwise
     """
+    # Scripts that run this file need not run `rational_array.py`.
     a, _ = raveled(a)
+    if isinstance(a[0], Fraction) and 'RationalArray' in globals():
+        return RationalArray(a).sum()
     if isinstance(a[0], numbers.Rational):
         return sum(a)
     if isinstance(a[0], mp.mpf):
@@ -179,13 +168,24 @@ def mean_var(frequency, x):
     Returns mean and variance for `frequency` distribution over `x`.
     
     The elements of array `frequency` are not necessarily integers. All
-    calculations are done with numbers of type `Fraction`.
+    calculations are exact (see `RationalArray`, if `rational_array.py`
+    has been run), and the results are of type `Fraction`.
     """
-    frequency = to_fraction(frequency)
-    x = to_fraction(x)
-    norm = sum(frequency)
-    mean = sum(frequency * x) / norm
-    var = sum(frequency * x**2) / norm - mean**2
+    # Rational arrays with common denominators give exact sums and dot
+    # products without a greatest common divisor for each element. If
+    # they are not available, calculate with arrays of `Fraction`.
+    if 'RationalArray' not in globals():
+        frequency = to_fraction(frequency)
+        x = to_fraction(x)
+        norm = sum(frequency)
+        mean = sum(frequency * x) / norm
+        var = sum(frequency * x**2) / norm - mean**2
+        return mean, var
+    frequency = _rational_array(frequency)
+    x = _rational_array(x)
+    norm = frequency.sum()
+    mean = frequency.dot(x) / norm
+    var = frequency.dot(x**2) / norm - mean**2
     return mean, var
 
    
@@ -202,6 +202,166 @@ def mean_and_variance(x, p):
     return mean, variance
 
 
+
+def convolution_power(q, L, method='direct'):
+    """
+    Returns the L-fold convolution of `q` with itself, truncated.
+
+    The elements of float array `q`, of odd length, are nonnegative, and
+    the middle element corresponds to zero. The result has the same
+    length as `q`, and is calculated by binary powering: every product
+    (squaring of the latest power of `q`, or multiplication of the
+    result by that power) is truncated like `np.convolve(x, y, 'same')`.
+    When L is a power of 2, the result is the same as that of squaring
+    `q` repeatedly. The positive integer L need not be a power of 2,
+    and costs at most log2(L) additional products.
+
+    Each product is calculated as specified by `method` (see
+    `convolve_same`).
+    """
+    result = None
+    power = q
+    while True:
+        if L & 1:
+            if result is None:
+                result = power
+            else:
+                result = convolve_same(result, power, method)
+        L >>= 1
+        if L == 0:
+            return result
+        power = convolve_same(power, power, method)
+
+
+def compound_poisson(dfe, U, method='direct', max_rate=2**-8):
+    """
+    Returns the compound Poisson distribution for `dfe`, truncated.
+
+    The number of mutations is Poisson-distributed with mean `U`, and
+    their effects are independent, each with distribution `dfe`, a float
+    array like `q` for `convolution_power`. The distribution of the sum
+    of effects is the limit, as L goes to infinity, of the L-fold
+    convolution of the single-locus distribution (U/L) `dfe`, plus mass
+    1 - U/L at zero.
+
+    The distribution is calculated by scaling and squaring. With k the
+    least nonnegative integer such that r = `U` / 2**k is no greater
+    than `max_rate`, the distribution for mean r is the sum over n of
+
+        exp(-r) r**n / n! `dfe`**n,
+
+    where `dfe`**n is the n-fold convolution. Terms are added until none
+    of the elements of a term is greater than the unit roundoff times
+    the corresponding element of the sum. The distribution is then
+    squared k times. Every product is truncated as for
+    `convolution_power`, and is calculated as specified by `method`.
+    The cost is about that of `convolution_power` for L = 2**k, plus
+    several products for the terms of the sum.
+    """
+    k = max(0, math.ceil(math.log2(U / max_rate))) if U > 0 else 0
+    rate = U / 2**k
+    term = np.zeros(len(dfe))
+    term[len(dfe) // 2] = math.exp(-rate)
+    result = term.copy()
+    unit_roundoff = np.finfo(float).eps / 2
+    n = 0
+    while np.any(term > unit_roundoff * result):
+        n += 1
+        term = convolve_same(term, dfe, method) * (rate / n)
+        result += term
+    return convolution_power(result, 2**k, method)
+
+
+def convolve_same(a, b, method='direct'):
+    """
+    Returns `np.convolve(a, b, 'same')` for arrays of equal odd length.
+
+    If `method` is 'direct', then `np.convolve` is called, with O(n**2)
+    operations. If `method` is 'fft', then `fft_convolve` is called.
+    The latter requires that the elements of `a` and `b` be
+    nonnegative.
+    """
+    if method == 'direct':
+        return np.convolve(a, b, 'same')
+    if method == 'fft':
+        return fft_convolve(a, b)
+    raise ValueError('Unknown convolution method {!r}'.format(method))
+
+
+def fft_convolve(a, b, rtol=1e-12):
+    """
+    Returns `np.convolve(a, b, 'same')`, calculated using the FFT.
+
+    The elements of `a` and `b`, arrays of equal odd length n, must be
+    nonnegative. The FFT calculation is accurate only relative to the
+    largest elements of the result: the absolute error of each element
+    is bounded by roughly `eps * log2(n) * norm(a) * norm(b)`, where
+    `eps` is the machine epsilon. The elements for which the bound
+    exceeds `rtol` times the calculated value are calculated anew as
+    dot products, with O(n) operations for each, by `np.convolve`. Thus
+    elements of distributions with long tails, e.g., masses near 1e-300,
+    are calculated accurately. The method is faster than direct
+    convolution when few elements are calculated anew, and is slightly
+    slower when nearly all are. The multi-locus distributions of
+    mutational effects, with most of their mass at zero, are of the
+    latter kind.
+    """
+    # Element m of the result is element m + center of the full linear
+    # convolution. Elements k0 through k1 - 1 of the full convolution
+    # are the 'valid' convolution of `a` with elements k0 - (n - 1)
+    # through k1 - 1 of `b`, padded with zeros.
+    n = len(a)
+    size = 2**math.ceil(math.log2(2*n - 1))
+    center = (n - 1) // 2
+    spectrum = np.fft.rfft(a, size) * np.fft.rfft(b, size)
+    result = np.fft.irfft(spectrum, size)[center:center+n]
+    zeros = np.zeros(n - 1)
+    padded = np.concatenate((zeros, b, zeros))
+    def direct(m0, m1):
+        k0, k1 = m0 + center, m1 + center
+        return np.convolve(a, padded[k0:k1+n-1], 'valid')
+    bound = fft_error_bound(size, a, b)
+    return recalculate_inaccurate(result, bound, rtol, direct)
+
+
+def fft_error_bound(size, a, b):
+    """
+    Returns a bound on the absolute error of an FFT convolution.
+
+    The bound applies to each element of the convolution of `a` and
+    `b`, calculated by FFTs of length `size`.
+    """
+    eps = np.finfo(float).eps
+    return 4 * eps * math.log2(size) * np.linalg.norm(a) * np.linalg.norm(b)
+
+
+def recalculate_inaccurate(result, bound, rtol, direct, skip=None):
+    """
+    Calculates anew the inaccurate elements of an FFT convolution.
+
+    The elements of `result` for which absolute error bound `bound`
+    exceeds `rtol` times the element, other than those indicated by
+    Boolean array `skip`, are inaccurate. Function `direct(i0, i1)`
+    returns elements `i0` through `i1 - 1`, calculated directly. It is
+    called once for each run of consecutive inaccurate elements, and
+    `result` is updated and returned. If more than half of the elements
+    are inaccurate, then it is faster to calculate all of them directly,
+    and `direct(0, len(result))` is returned.
+    """
+    inaccurate = ~(result * rtol >= bound)
+    if skip is not None:
+        inaccurate &= ~skip
+    inaccurate = np.flatnonzero(inaccurate)
+    n = len(result)
+    if len(inaccurate) > n // 2:
+        return direct(0, n)
+    if len(inaccurate) > 0:
+        breaks = np.flatnonzero(np.diff(inaccurate) > 1) + 1
+        for run in np.split(inaccurate, breaks):
+            i0, i1 = run[0], run[-1] + 1
+            result[i0:i1] = direct(i0, i1)
+    return result
+
 def print3D(a, field_format=' {:4.2e}', col_space=' '*2):
     """
     Print 3D array in 2D.
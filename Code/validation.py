@@ -9,16 +9,23 @@ def zero_loci_prob(q):
 
 
 class AltSanford(Sanford):
-    def gamma_ccdf(self, x):
-        """
-        Return values of the Gamma complementary CDF at points in `x`.
-        
-        Values are calculated as multiprecision floats, and returned as
-        `Fraction` objects.
-        """
-        # Shape alpha = 0.5, and rate beta is set on initialization.
-        z = to_mpf(self.beta * x)
-        return to_fraction(mp_erfc(mp_sqrt(z)))
+    """
+    Sanford's DFE, with Gamma masses calculated as originally.
+
+    The masses are differences of values of the Gamma complementary CDF,
+    calculated as multiprecision floats, whatever the `multiprecision`
+    setting. The cache is separate from that of `Sanford`, so that the
+    two classes are compared, rather than one class with itself.
+    """
+    cache = LRUCache()
+    q_cache = None
+
+    @staticmethod
+    def _bin_masses(beta, x, multiprecision):
+        # Return the Gamma CDF at `x[0]`, and the masses between points
+        # in `x`, as `Fraction` objects. Shape alpha = 0.5.
+        ccdf_values = to_fraction(mp_erfc(mp_sqrt(to_mpf(beta * x))))
+        return 1 - ccdf_values[0], ccdf_values[:-1] - ccdf_values[1:]
 
 
 def check_dfe(dfeclass, K, gamma='1e-3', w='4e-5'):
@@ -53,3 +60,40 @@ class AltSolver(Solver):
         """
         return mp.mpf(2.0)**-self.s_bias * self.s
 
+
+
+def check_to_fraction(a):
+    #
+    fractions = to_fraction(a)
+    reference = reference_to_fraction(a)
+    exact = np.all(np.ravel(fractions) == np.ravel(reference))
+    print('elements     :', np.size(reference))
+    print('types        :', sorted({type(x).__name__ for x in np.ravel(a)}))
+    print('exact        :', exact)
+    return exact
+
+def reference_to_fraction(a):
+    """
+    Converts (array) `a` to (array of) `Fraction` object(s).
+
+    This is the original, elementwise implementation of `to_fraction`,
+    retained to check the faster implementation.
+    """
+    if isinstance(a, np.ndarray):
+        if a.dtype is np.dtype('int64'):
+            a = a.astype(object)
+    elif type(a) is np.int64:
+        a = int(a)
+    a, shape = raveled(a)
+    try:
+        a = [Fraction(x) for x in a]
+        return shaped(a, shape)
+    except TypeError:
+        pass
+    c, power = mp_frexp(a)
+    numerator_power = max(mp.prec, np.max(power))
+    denominator_power = numerator_power - power
+    numerators = [int(p) for p in mp_ldexp(c, numerator_power)]
+    denominators = 2**denominator_power
+    a = [Fraction(p, q) for p, q in zip(numerators, denominators)]
+    return shaped(a, shape)